@@ -6,6 +6,86 @@ class Settings(BaseSettings):
     open_router_api_key: str = ""
     database_url: str = "sqlite:///./jobs.db"
 
+    # SQLite tuning applied on every connection
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # bytes
+    sqlite_cache_size_kb: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Shared Chromium pool used by all scrapers
+    browser_pool_size: int = 4  # max concurrent browser contexts
+    browser_max_uses: int = 50  # recycle a browser after this many contexts
+    browser_launch_timeout: float = 30.0
+
+    # Abort images/fonts/trackers on scraper pages (see scrapers/network.py)
+    scraper_block_resources: bool = True
+    scraper_blocked_domains: list[str] = []
+
+    # Scraper waits: cap for the first content after navigation and for each
+    # later wait step, plus an optional random politeness pause between actions
+    scraper_load_timeout: float = 15.0
+    scraper_step_timeout: float = 5.0
+    scraper_jitter_min: float = 0.0
+    scraper_jitter_max: float = 0.5
+
+    # Results pages fetched at once (each in its own browser context) for
+    # searches larger than one page
+    scraper_page_concurrency: dict[str, int] = {"linkedin": 3, "glassdoor": 2}
+
+    # LinkedIn backend: "http" (guest API, no browser), "browser", or "auto"
+    # (HTTP first, browser when blocked or empty)
+    linkedin_backend: str = "auto"
+    http_max_connections: int = 20
+    http_timeout: float = 15.0
+
+    # Search result cache (seconds / bytes); set search_cache_db to a file
+    # path to keep cached results across restarts
+    search_cache_ttl_linkedin: int = 900
+    search_cache_ttl_glassdoor: int = 1800
+    search_cache_max_bytes: int = 20_000_000
+    search_cache_db: str = ""
+
+    # /search/stream sends jobs in micro-batches of up to this many jobs, or
+    # whatever arrived within the window (seconds) after a batch's first job
+    stream_batch_size: int = 5
+    stream_batch_window: float = 0.25
+
+    # Background description prefetch for newly ingested jobs: fetches at
+    # once, per-platform requests/second, and batched write-back
+    prefetch_enabled: bool = True
+    prefetch_concurrency: int = 2
+    prefetch_rate_per_platform: dict[str, float] = {"linkedin": 1.0, "glassdoor": 0.5}
+    prefetch_queue_size: int = 1000
+    prefetch_write_batch: int = 20
+    prefetch_write_window: float = 1.0
+
+    # LLM calls: concurrent completions per backend
+    ai_concurrency: dict[str, int] = {"ollama": 1, "openrouter": 4}
+
+    # Optional JSON file of extra skills, {"term as written": "Display Name"},
+    # added to the built-in dictionary used for skill extraction and scoring
+    skills_file: str = ""
+
+    # Local pre-score (0-100) blending skill overlap (this weight) with
+    # TF-IDF similarity; jobs below the gate skip the LLM (0 disables)
+    local_score_skill_weight: float = 0.6
+    local_score_gate: float = 10.0
+
+    # Analyses run at once by /api/analysis/rank (per request)
+    rank_concurrency: int = 4
+
+    # AI backend health: probe interval and how long a probe result is
+    # trusted (seconds); skip a backend for the cooldown after this many
+    # failures in a row
+    ai_health_interval: float = 30.0
+    ai_health_ttl: float = 90.0
+    ai_breaker_threshold: int = 3
+    ai_breaker_cooldown: float = 60.0
+
+    # Cache of LLM analysis results in the main database, bounded by the
+    # total size of the stored JSON (bytes)
+    analysis_cache_enabled: bool = True
+    analysis_cache_max_bytes: int = 5_000_000
+
     class Config:
         env_file = ".env"
         extra = "ignore"  # Ignore extra fields like old GEMINI_API_KEY
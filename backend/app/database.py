@@ -1,26 +1,55 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
 from .config import get_settings
+from .migrations import run_migrations
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def async_database_url(url: str) -> str:
+    """Use the aiosqlite driver for plain sqlite:// URLs."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+engine = create_async_engine(async_database_url(settings.database_url))
+# Plain driver for CPU-heavy writes run in worker threads (see ingest()), so
+# their Python work doesn't run on the event loop the way run_sync() does
+sync_engine = create_engine(settings.database_url)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+@event.listens_for(sync_engine, "connect")
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL journaling plus larger page cache and mmap for every SQLite connection."""
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# expire_on_commit=False: rows stay readable after commit without a lazy
+# reload, which AsyncSession cannot do implicitly
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+SyncSessionLocal = sessionmaker(sync_engine, expire_on_commit=False, autoflush=False)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
@@ -3,15 +3,32 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from .database import init_db
-from .routers import jobs, analysis
+from .routers import jobs, analysis, resumes
+from .scrapers.browser_pool import browser_pool
+from .scrapers.http_client import close_http_client
+from .scrapers.network import blocking_stats
+from .services.ai_health import ai_health
+from .services.ai_service import ai_service
+from .services.analysis_cache import analysis_cache
+from .services.prefetch import description_prefetcher
+from .services.search_cache import search_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    init_db()
+    await init_db()
+    await browser_pool.start()
+    await description_prefetcher.start()
+    await ai_health.start()
     yield
     # Shutdown
+    await ai_health.stop()
+    await description_prefetcher.stop()
+    await browser_pool.stop()
+    await close_http_client()
+    await ai_service.close()
+    await search_cache.close()
 
 
 app = FastAPI(
@@ -33,6 +50,7 @@ app.add_middleware(
 # Include routers
 app.include_router(jobs.router)
 app.include_router(analysis.router)
+app.include_router(resumes.router)
 
 
 @app.get("/")
@@ -42,12 +60,26 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "search_jobs": "POST /api/jobs/search",
+            "search_stored_jobs": "GET /api/jobs",
+            "jobs_by_skills": "GET /api/jobs/by-skills",
             "get_job": "GET /api/jobs/{job_id}",
+            "get_jobs_details": "POST /api/jobs/details",
+            "upload_resume": "POST /api/resumes",
             "analyze_resume": "POST /api/analysis/match",
+            "analyze_resume_stream": "POST /api/analysis/match/stream",
+            "rank_jobs": "POST /api/analysis/rank",
         },
     }
 
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "browser_pool": browser_pool.status(),
+        "network": blocking_stats(),
+        "search_cache": search_cache.status(),
+        "prefetch": description_prefetcher.status(),
+        "ai": ai_health.status(),
+        "analysis_cache": analysis_cache.status(),
+    }
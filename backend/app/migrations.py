@@ -0,0 +1,168 @@
+from typing import Callable, Union
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+import zlib
+
+from .services.skills import extract_skills
+
+# Schema migrations for existing jobs.db files, tracked with PRAGMA user_version.
+# create_all() builds new databases at the latest schema, so every step must be
+# safe to run on a database that already has it (IF NOT EXISTS etc.).
+# A step is either an SQL string or a callable taking the connection.
+Step = Union[str, Callable[[Connection], None]]
+
+
+def move_descriptions_out_of_jobs(conn: Connection):
+    """Compress jobs.description into job_descriptions and drop the column."""
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(jobs)")]
+    if "description" not in columns:
+        return
+
+    rows = conn.exec_driver_sql(
+        "SELECT id, description FROM jobs WHERE description IS NOT NULL AND description != ''"
+    ).all()
+    if rows:
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO job_descriptions (job_id, content, codec) VALUES (?, ?, 'zlib')",
+            [(job_id, zlib.compress(text.encode("utf-8"), 6)) for job_id, text in rows],
+        )
+
+    try:
+        conn.exec_driver_sql("ALTER TABLE jobs DROP COLUMN description")
+    except Exception:
+        # SQLite < 3.35 cannot drop columns; clear the old text instead
+        conn.exec_driver_sql("UPDATE jobs SET description = NULL")
+    print(f"Moved {len(rows)} job descriptions to job_descriptions")
+
+
+def backfill_job_skills(conn: Connection):
+    """Extract skills from descriptions stored before job_skills existed."""
+    rows = conn.exec_driver_sql(
+        "SELECT job_id, content FROM job_descriptions "
+        "WHERE job_id NOT IN (SELECT DISTINCT job_id FROM job_skills)"
+    ).all()
+    skill_rows = [
+        (job_id, skill, mentions)
+        for job_id, content in rows
+        for skill, mentions in extract_skills(zlib.decompress(content).decode("utf-8")).items()
+    ]
+    if skill_rows:
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO job_skills (job_id, skill, mentions) VALUES (?, ?, ?)",
+            skill_rows,
+        )
+    print(f"Extracted skills from {len(rows)} stored job descriptions")
+
+
+def create_jobs_fts(conn: Connection):
+    """Full-text index over jobs and their descriptions (see local_search.py).
+
+    The table is contentless (descriptions stay compressed in
+    job_descriptions only) and keyed on job_search_keys.key: new jobs are
+    indexed by a trigger, descriptions by save_descriptions_sync().
+    """
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+    ).first()
+    if exists:
+        return
+
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE jobs_fts USING fts5("
+        "title, company, location, description, "
+        "content='', tokenize='unicode61 remove_diacritics 2')"
+    )
+    # BM25 column weights: a hit in the title counts most
+    conn.exec_driver_sql("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 1.0)')")
+    conn.exec_driver_sql(
+        "CREATE TRIGGER jobs_fts_insert AFTER INSERT ON jobs BEGIN "
+        "INSERT INTO job_search_keys (job_id) VALUES (new.id); "
+        "INSERT INTO jobs_fts (rowid, title, company, location, description) "
+        "VALUES (last_insert_rowid(), new.title, new.company, coalesce(new.location, ''), ''); "
+        "END"
+    )
+
+    # Oldest jobs get the lowest keys, which is the no-query search order
+    conn.exec_driver_sql(
+        "INSERT OR IGNORE INTO job_search_keys (job_id) SELECT id FROM jobs ORDER BY created_at, rowid"
+    )
+    rows = conn.exec_driver_sql(
+        "SELECT job_search_keys.key, jobs.title, jobs.company, coalesce(jobs.location, ''), "
+        "job_descriptions.content FROM jobs "
+        "JOIN job_search_keys ON job_search_keys.job_id = jobs.id "
+        "LEFT JOIN job_descriptions ON job_descriptions.job_id = jobs.id"
+    ).all()
+    if rows:
+        conn.exec_driver_sql(
+            "INSERT INTO jobs_fts (rowid, title, company, location, description) VALUES (?, ?, ?, ?, ?)",
+            [
+                (key, title, company, location, zlib.decompress(content).decode("utf-8") if content else "")
+                for key, title, company, location, content in rows
+            ],
+        )
+    print(f"Indexed {len(rows)} jobs for full-text search")
+
+
+def link_existing_duplicates(conn: Connection):
+    """Add jobs.canonical_id and fingerprint the jobs already stored, oldest
+    first, linking near-duplicates as ingest does: at most one job per
+    platform in each group (see link_duplicates_sync())."""
+    # Imported here: the services import the models, which import database
+    from sqlalchemy.orm import Session
+    from .models import Job
+    from .services.dedup import link_duplicates_sync
+    from .services.descriptions import load_descriptions_sync, save_descriptions_sync
+
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(jobs)")]
+    if "canonical_id" not in columns:
+        conn.exec_driver_sql("ALTER TABLE jobs ADD COLUMN canonical_id VARCHAR")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_jobs_canonical_id ON jobs (canonical_id)")
+    conn.exec_driver_sql("UPDATE jobs SET canonical_id = id WHERE canonical_id IS NULL")
+
+    db = Session(bind=conn)
+    jobs = list(db.scalars(select(Job).order_by(Job.created_at, text("jobs.rowid"))))
+    descriptions = load_descriptions_sync(db, [job.id for job in jobs])
+    links = link_duplicates_sync(db, jobs, descriptions)
+    # Duplicates without a description take their canonical job's
+    save_descriptions_sync(db, {
+        canonical_id: descriptions[canonical_id]
+        for canonical_id in set(links.values())
+        if canonical_id in descriptions
+    })
+    db.flush()
+    db.close()
+    print(f"Fingerprinted {len(jobs)} jobs, {len(links)} duplicates linked")
+
+
+MIGRATIONS: list[tuple[int, str, list[Step]]] = [
+    (1, "jobs access-pattern indexes", [
+        "CREATE INDEX IF NOT EXISTS ix_jobs_platform_created_at ON jobs (platform, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_job_type_created_at ON jobs (job_type, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_company ON jobs (company)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_created_at ON jobs (created_at)",
+        "ANALYZE jobs",
+    ]),
+    (2, "compressed job_descriptions table", [move_descriptions_out_of_jobs]),
+    (3, "job_skills inverted index", [backfill_job_skills]),
+    (4, "jobs_fts full-text index", [create_jobs_fts]),
+    (5, "near-duplicate fingerprints", [link_existing_duplicates]),
+]
+
+
+def run_migrations(conn: Connection):
+    """Apply pending migrations in order (run inside init_db's transaction)."""
+    if conn.dialect.name != "sqlite":
+        return
+
+    version = conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+    for target, name, steps in MIGRATIONS:
+        if target <= version:
+            continue
+        for step in steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.exec_driver_sql(step)
+        conn.exec_driver_sql(f"PRAGMA user_version = {target}")
+        print(f"Applied database migration {target}: {name}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Text, Index, LargeBinary, ForeignKey
 from sqlalchemy.sql import func
 from .database import Base
 import uuid
@@ -13,8 +13,114 @@ class Job(Base):
     location = Column(String)
     job_type = Column(String)  # remote, onsite, hybrid
     salary_range = Column(String)
-    description = Column(Text)
     url = Column(String, unique=True)
     platform = Column(String)  # linkedin, glassdoor
     posted_date = Column(String)
+    canonical_id = Column(String)  # first-seen job this one duplicates (its own id if none)
     created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # Recent jobs per platform / job type, and company lookups
+        Index("ix_jobs_platform_created_at", "platform", "created_at"),
+        Index("ix_jobs_job_type_created_at", "job_type", "created_at"),
+        Index("ix_jobs_company", "company"),
+        Index("ix_jobs_created_at", "created_at"),
+        Index("ix_jobs_canonical_id", "canonical_id"),
+    )
+
+
+class JobDescription(Base):
+    """Job descriptions live apart from jobs, compressed, and are only loaded
+    when a single job's details or an analysis needs them."""
+
+    __tablename__ = "job_descriptions"
+
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    content = Column(LargeBinary, nullable=False)
+    codec = Column(String, nullable=False, default="zlib")
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class Resume(Base):
+    """Parsed resume text, keyed by the SHA-256 of the uploaded file."""
+
+    __tablename__ = "resumes"
+
+    id = Column(String, primary_key=True)  # content hash
+    filename = Column(String)
+    size = Column(Integer)  # bytes uploaded
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+
+
+class AnalysisCacheEntry(Base):
+    """A cached LLM resume/job analysis, keyed by a hash of its inputs."""
+
+    __tablename__ = "analysis_cache"
+
+    key = Column(String, primary_key=True)
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"))
+    description_hash = Column(String)  # entries for an old description are invalidated
+    model = Column(String, nullable=False)
+    prompt_version = Column(Integer, nullable=False)
+    result = Column(Text, nullable=False)  # JSON
+    size = Column(Integer, nullable=False)
+    latency_ms = Column(Float, nullable=False)  # how long the LLM call took
+    created_at = Column(DateTime, default=func.now())
+    last_used_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_analysis_cache_job_id", "job_id"),
+        Index("ix_analysis_cache_last_used_at", "last_used_at"),
+    )
+
+
+
+class JobSearchKey(Base):
+    """Integer key of each job in the jobs_fts full-text index. The jobs
+    table has a string primary key, so its implicit rowid may be renumbered
+    by VACUUM; this INTEGER PRIMARY KEY is stable, and never reused."""
+
+    __tablename__ = "job_search_keys"
+
+    key = Column(Integer, primary_key=True)  # jobs_fts rowid
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, unique=True)
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+class JobSkill(Base):
+    """Skills found in a job's description. The (skill, job_id) index is the
+    inverted index behind skill queries."""
+
+    __tablename__ = "job_skills"
+
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)  # display name from the skill dictionary
+    mentions = Column(Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        Index("ix_job_skills_skill_job_id", "skill", "job_id"),
+    )
+
+
+class JobFingerprint(Base):
+    """SimHash fingerprints for near-duplicate detection. Each 16-bit band
+    of the title/company/location fingerprint is indexed, so candidates are
+    found with exact band lookups (LSH) instead of a table scan."""
+
+    __tablename__ = "job_fingerprints"
+
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    simhash = Column(BigInteger, nullable=False)  # signed 64-bit
+    description_simhash = Column(BigInteger)  # None until the description is known
+    band0 = Column(Integer, nullable=False)
+    band1 = Column(Integer, nullable=False)
+    band2 = Column(Integer, nullable=False)
+    band3 = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_job_fingerprints_band0", "band0"),
+        Index("ix_job_fingerprints_band1", "band1"),
+        Index("ix_job_fingerprints_band2", "band2"),
+        Index("ix_job_fingerprints_band3", "band3"),
+    )
@@ -1,65 +1,271 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Optional
+import asyncio
+import json
 
+from ..config import get_settings
 from ..database import get_db
-from ..models import Job
-from ..schemas import ResumeAnalysisResponse
-from ..services.ai_service import AIService
-from ..services.resume_parser import extract_resume_text
-from ..scrapers.linkedin import LinkedInScraper
-from ..scrapers.glassdoor import GlassdoorScraper
+from ..models import Job, Resume
+from ..schemas import JobResponse, RankRequest, ResumeAnalysisResponse
+from ..services.ai_health import ai_health
+from ..services.ai_service import ai_service
+from ..services.analysis_stream import ITEM_EVENTS
+from ..services.descriptions import load_description, load_descriptions
+from ..services.job_skills import load_job_skills, skill_match, skills_in
+from ..services.local_scorer import local_scorer
+from ..services.ranking import rank_jobs
+from ..services.prefetch import description_prefetcher
+from ..services.resumes import get_resume, store_resume
+from .jobs import run_search
 
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
+settings = get_settings()
 
+# How often (seconds) to check whether the client is still waiting
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[Any]) -> Any:
+    """Await `awaitable`, cancelling it if the client disconnects first."""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        task.cancel()
+
+
+class MatchInputs:
+    """What /match and /match/stream know before the LLM runs: the job (its
+    canonical job for duplicates), its description, the stored resume, the
+    skill-index match and the local score."""
+
+    def __init__(self, job: Job, description: str, stored: Resume, skills: dict, local: dict):
+        self.job = job
+        self.description = description
+        self.stored = stored
+        self.skills = skills
+        self.local = local
+
+    @property
+    def gated(self) -> bool:
+        """Jobs sharing almost no vocabulary with the resume skip the LLM."""
+        return not local_scorer.passes_gate(self.local["score"])
+
+    def response(self, analysis: dict) -> ResumeAnalysisResponse:
+        # Matching/missing skills come from the skill index, not the LLM
+        return ResumeAnalysisResponse(
+            **{"local_score": self.local["score"], **analysis, **self.skills}, resume_id=self.stored.id
+        )
+
+
+async def load_match_inputs(
+    db: AsyncSession,
+    job_id: str,
+    resume: Optional[UploadFile],
+    resume_id: Optional[str],
+) -> MatchInputs:
+    """The inputs of a match request, or an HTTPException."""
+    if (resume is None) == (resume_id is None):
+        raise HTTPException(status_code=400, detail="Provide either resume or resume_id")
 
-@router.post("/match", response_model=ResumeAnalysisResponse)
-async def analyze_resume_match(
-    job_id: str = Form(...),
-    resume: UploadFile = File(...),
-    db: Session = Depends(get_db),
-):
     # Get the job from database
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # If no description, fetch it
-    if not job.description:
-        if job.platform == "linkedin":
-            scraper = LinkedInScraper()
-            details = await scraper.get_job_details(job.url)
-        else:
-            scraper = GlassdoorScraper()
-            details = await scraper.get_job_details(job.url)
-
-        if details.get("description"):
-            job.description = details["description"]
-            db.commit()
-        else:
+    # Duplicates are analyzed as their canonical job, sharing its cached result
+    if job.canonical_id and job.canonical_id != job.id:
+        job = await db.get(Job, job.canonical_id) or job
+
+    # If no description yet, fetch it (or wait for the prefetch in flight)
+    description = await load_description(db, job.id)
+    if not description:
+        description = await description_prefetcher.fetch(job.id, job.platform, job.url)
+        if not description:
             raise HTTPException(
                 status_code=400,
                 detail="Could not fetch job description for analysis"
             )
 
-    # Parse resume
-    try:
-        file_content = await resume.read()
-        resume_text = extract_resume_text(resume.filename, file_content)
+    # Parse resume (once per distinct file)
+    if resume_id is not None:
+        stored = await get_resume(db, resume_id)
+        if not stored:
+            raise HTTPException(status_code=404, detail="Resume not found")
+    else:
+        try:
+            stored = await store_resume(db, resume.filename, await resume.read())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        if not resume_text:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from resume"
-            )
+    job_skills = (await load_job_skills(db, [job.id])).get(job.id) or skills_in(description)
+    skills = skill_match(job_skills, set(skills_in(stored.text)))
+    local = local_scorer.score(stored.text, description)
+    return MatchInputs(job, description, stored, skills, local)
+
+
+@router.post("/match", response_model=ResumeAnalysisResponse)
+async def analyze_resume_match(
+    request: Request,
+    job_id: str = Form(...),
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Analyze a resume against a job; pass either a resume file or the
+    resume_id returned by POST /api/resumes."""
+    inputs = await load_match_inputs(db, job_id, resume, resume_id)
+    if inputs.gated:
+        return inputs.response(local_scorer.gated_analysis(inputs.local))
+
+    # Analyze with AI (Ollama local or OpenRouter fallback); the LLM call is
+    # aborted if the client goes away
+    try:
+        result = await cancel_on_disconnect(request, ai_service.analyze_resume_match(
+            resume_text=inputs.stored.text,
+            job_description=inputs.description,
+            job_title=inputs.job.title,
+            job_id=inputs.job.id,
+        ))
+    except ClientDisconnected:
+        return Response(status_code=499)
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    # Analyze with AI (Ollama local or OpenRouter fallback)
-    ai_service = AIService()
-    result = await ai_service.analyze_resume_match(
-        resume_text=resume_text,
-        job_description=job.description,
-        job_title=job.title,
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return inputs.response(result)
+
+
+@router.post("/match/stream")
+async def stream_resume_match(
+    job_id: str = Form(...),
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Same as /match, streamed with Server-Sent Events: the match percentage,
+    each skill and each recommendation are sent as soon as the model has
+    written them, then the full analysis, made of those same values, as a
+    "result" event."""
+    inputs = await load_match_inputs(db, job_id, resume, resume_id)
+    skills = inputs.skills
+
+    # Errors after the first event can't change the status code
+    if not inputs.gated:
+        try:
+            ai_health.select_backend()
+        except ValueError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+    def result_event(analysis: dict) -> str:
+        response = inputs.response(analysis)
+        return f"data: {json.dumps({'type': 'result', 'analysis': response.model_dump()})}\n\n"
+
+    async def event_generator():
+        start = {
+            "type": "start",
+            "job_id": inputs.job.id,
+            "resume_id": inputs.stored.id,
+            "local_score": inputs.local["score"],
+        }
+        yield f"data: {json.dumps(start)}\n\n"
+        if inputs.gated:
+            yield result_event(local_scorer.gated_analysis(inputs.local))
+            return
+
+        # Skills from the index are known up front and replace the model's
+        for field, event_type in ITEM_EVENTS.items():
+            for skill in skills.get(field, []):
+                yield f"data: {json.dumps({'type': event_type, 'value': skill})}\n\n"
+
+        # Disconnecting cancels this generator, which aborts the LLM request
+        try:
+            async for event in ai_service.stream_resume_match(
+                resume_text=inputs.stored.text,
+                job_description=inputs.description,
+                job_title=inputs.job.title,
+                job_id=inputs.job.id,
+            ):
+                if event["type"] == "result":
+                    yield result_event(event["analysis"])
+                elif not (skills and event["type"] in ("matching_skill", "missing_skill")):
+                    yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
     )
 
-    return ResumeAnalysisResponse(**result)
+
+@router.post("/rank")
+async def rank_resume(request: RankRequest, db: AsyncSession = Depends(get_db)):
+    """Analyze one resume against many jobs and stream results as they
+    complete, using Server-Sent Events"""
+    if (request.job_ids is None) == (request.search is None):
+        raise HTTPException(status_code=400, detail="Provide either job_ids or search")
+
+    stored = await get_resume(db, request.resume_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    if request.search is not None:
+        jobs = await run_search(request.search, db)
+    else:
+        job_ids = list(dict.fromkeys(request.job_ids))
+        found = {job.id: job for job in await db.scalars(select(Job).where(Job.id.in_(job_ids)))}
+        jobs = [found[job_id] for job_id in job_ids if job_id in found]
+
+    # Duplicates are analyzed as their canonical job, sharing its cached result
+    listed = {job.id for job in jobs}
+    canonical_ids = list({job.canonical_id for job in jobs if job.canonical_id and job.canonical_id not in listed})
+    canonical_jobs = {job.id: job for job in await db.scalars(select(Job).where(Job.id.in_(canonical_ids)))}
+    analyzed = [canonical_jobs.get(job.canonical_id, job) for job in jobs]
+    descriptions = await load_descriptions(db, [job.id for job in analyzed])
+    job_skills = await load_job_skills(db, [job.id for job in analyzed])
+
+    async def event_generator():
+        yield f"data: {json.dumps({'type': 'start', 'total': len(jobs)})}\n\n"
+        try:
+            async for event in rank_jobs(
+                stored.text,
+                jobs,
+                descriptions,
+                job_skills,
+                concurrency=settings.rank_concurrency,
+                top_k=request.top_k,
+                min_match=request.min_match,
+                canonical_jobs=canonical_jobs,
+            ):
+                if event["type"] == "result":
+                    event = {**event, "job": JobResponse.model_validate(event["job"]).model_dump()}
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -1,32 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import asyncio
-import uuid
 import json
 
+from ..config import get_settings
 from ..database import get_db, SessionLocal
 from ..models import Job
-from ..schemas import JobSearchRequest, JobSearchResponse, JobResponse, Platform
+from ..schemas import (
+    JobDetailsRequest, JobSearchRequest, JobSearchResponse, JobResponse, JobType, LocalSearchResponse, Platform
+)
 from ..scrapers.linkedin import LinkedInScraper
 from ..scrapers.glassdoor import GlassdoorScraper
+from ..services.batching import micro_batches
+from ..services.descriptions import load_description, load_descriptions
+from ..services.ingest import ingest
+from ..services.job_skills import find_jobs_with_skills
+from ..services.local_search import search_local
+from ..services.prefetch import description_prefetcher
+from ..services.search_cache import search_cache, make_search_key
+from ..services.singleflight import Flight, SingleFlight
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+settings = get_settings()
+
+# Identical searches running at the same time share one scrape per platform
+scrape_flights = SingleFlight()
 
 
 @router.post("/search", response_model=JobSearchResponse)
-async def search_jobs(request: JobSearchRequest, db: Session = Depends(get_db)):
-    all_jobs = []
-    tasks = []
+async def search_jobs(request: JobSearchRequest, response: Response, db: AsyncSession = Depends(get_db)):
+    # Serve platforms from the result cache where possible
+    cached = await get_cached_results(request)
+    local = await get_local_results(request, db)
+    response.headers["X-Cache"] = cache_header(cached)
+    response.headers["X-Cache-Platforms"] = cache_platforms_header(cached)
+    if request.local_first:
+        response.headers["X-Local-Platforms"] = local_platforms_header(local)
+
+    saved = await run_search(request, db, cached, local)
+    job_responses = [JobResponse.model_validate(job) for job in saved]
 
-    job_type = request.job_type.value if request.job_type else "all"
+    return JobSearchResponse(jobs=job_responses, total=len(job_responses))
 
-    # Create scraping tasks based on selected platforms
-    if Platform.LINKEDIN in request.platforms:
-        tasks.append(scrape_linkedin(request.query, request.location, job_type))
 
-    if Platform.GLASSDOOR in request.platforms:
-        tasks.append(scrape_glassdoor(request.query, request.location, job_type))
+async def run_search(
+    request: JobSearchRequest,
+    db: AsyncSession,
+    cached: dict[Platform, list[dict] | None] | None = None,
+    local: dict[Platform, list[Job]] | None = None,
+) -> list[Job]:
+    """Scrape (or read from the cache) every requested platform, save the jobs
+    and return the persisted rows.
+
+    With request.local_first, stored matches come first and platforms with
+    at least max_results of them are not scraped; the others are topped up
+    with scraped jobs.
+    """
+    if cached is None:
+        cached = await get_cached_results(request)
+    if local is None:
+        local = await get_local_results(request, db)
+
+    all_jobs = []
+    tasks = []
+    for platform in cached:
+        if len(local.get(platform, [])) >= request.max_results:
+            continue
+        if cached[platform] is not None:
+            all_jobs.extend(cached[platform])
+        else:
+            tasks.append(scrape_platform(platform, request))
 
     # Run scrapers concurrently
     results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -37,94 +83,114 @@ async def search_jobs(request: JobSearchRequest, db: Session = Depends(get_db)):
         elif isinstance(result, Exception):
             print(f"Scraping error: {result}")
 
-    # Save jobs to database and prepare response
-    job_responses = []
-    for job_data in all_jobs:
-        # Check if job already exists
-        existing = db.query(Job).filter(Job.url == job_data["url"]).first()
-
-        if existing:
-            job = existing
-        else:
-            job = Job(
-                id=str(uuid.uuid4()),
-                title=job_data["title"],
-                company=job_data["company"],
-                location=job_data.get("location"),
-                job_type=job_data.get("job_type"),
-                salary_range=job_data.get("salary_range"),
-                description=job_data.get("description"),
-                url=job_data["url"],
-                platform=job_data["platform"],
-                posted_date=job_data.get("posted_date"),
-            )
-            db.add(job)
-
-        job_responses.append(JobResponse.model_validate(job))
-
-    db.commit()
-
-    return JobSearchResponse(jobs=job_responses, total=len(job_responses))
+    # Save jobs to database
+    saved = await ingest(all_jobs, refresh=True)
+    description_prefetcher.enqueue(saved)
+
+    results = saved
+    if request.local_first:
+        results = []
+        for platform in request.platforms:
+            stored = local.get(platform, [])
+            seen = {job.id for job in stored}
+            scraped = [job for job in saved if job.platform == platform.value and job.id not in seen]
+            results.extend(stored + scraped[:request.max_results - len(stored)])
+    if request.collapse_duplicates:
+        results = collapse_duplicates(results)
+    return results
+
+
+def collapse_duplicates(jobs: list[Job]) -> list[Job]:
+    """Keep the first job of each canonical_id."""
+    seen = set()
+    collapsed = []
+    for job in jobs:
+        canonical_id = job.canonical_id or job.id
+        if canonical_id not in seen:
+            seen.add(canonical_id)
+            collapsed.append(job)
+    return collapsed
 
 
 @router.post("/search/stream")
 async def search_jobs_stream(request: JobSearchRequest):
     """Stream job results as they're found using Server-Sent Events"""
 
+    cached = await get_cached_results(request)
+    async with SessionLocal() as db:
+        local = await get_local_results(request, db)
+
     async def event_generator():
-        job_type = request.job_type.value if request.job_type else "all"
-        db = SessionLocal()
+        tasks = []
 
         try:
             # Send start event
             yield f"data: {json.dumps({'type': 'start', 'platforms': [p.value for p in request.platforms]})}\n\n"
 
-            async def scrape_and_stream(platform: str, scraper_func):
+            # Each platform pumps its batches into one queue; a None batch
+            # marks the platform as finished
+            queue: asyncio.Queue = asyncio.Queue()
+
+            async def scrape_and_stream(platform: Platform):
                 try:
-                    jobs = await scraper_func(request.query, request.location, job_type)
-                    return platform, jobs
+                    if cached[platform] is not None:
+                        await queue.put((platform.value, cached[platform], True))
+                    else:
+                        # Late joiners get already-emitted batches replayed first
+                        async for batch in scrape_flight(platform, request).subscribe():
+                            await queue.put((platform.value, batch, False))
                 except Exception as e:
-                    print(f"{platform} error: {e}")
-                    return platform, []
-
-            tasks = []
-            if Platform.LINKEDIN in request.platforms:
-                tasks.append(scrape_and_stream("linkedin", scrape_linkedin))
-            if Platform.GLASSDOOR in request.platforms:
-                tasks.append(scrape_and_stream("glassdoor", scrape_glassdoor))
-
-            # Process results as they complete
-            for coro in asyncio.as_completed(tasks):
-                platform, jobs = await coro
+                    print(f"{platform.value} error: {e}")
+                finally:
+                    await queue.put((platform.value, None, False))
+
+            # Stored matches (local_first) go out before anything is scraped;
+            # platforms with enough of them are not scraped at all
+            counts = {platform.value: 0 for platform in cached}
+            sent = {platform.value: set() for platform in cached}
+            canonical_sent = set()
+            for platform, stored in local.items():
+                if request.collapse_duplicates:
+                    stored = [job for job in collapse_duplicates(stored) if job.canonical_id not in canonical_sent]
+                    canonical_sent.update(job.canonical_id for job in stored)
+                stored_jobs = [JobResponse.model_validate(job).model_dump() for job in stored]
+                counts[platform.value] += len(stored_jobs)
+                sent[platform.value].update(job.id for job in stored)
+                yield f"data: {json.dumps({'type': 'jobs', 'platform': platform.value, 'jobs': stored_jobs, 'count': len(stored_jobs), 'cached': False, 'local': True})}\n\n"
+
+            to_scrape = [platform for platform in cached if len(local.get(platform, [])) < request.max_results]
+            for platform in cached:
+                if platform not in to_scrape:
+                    yield f"data: {json.dumps({'type': 'platform_done', 'platform': platform.value, 'count': counts[platform.value]})}\n\n"
+
+            tasks = [asyncio.create_task(scrape_and_stream(platform)) for platform in to_scrape]
+            pending = len(tasks)
+
+            # Process micro-batches as they arrive
+            while pending:
+                platform, jobs, from_cache = await queue.get()
+                if jobs is None:
+                    pending -= 1
+                    yield f"data: {json.dumps({'type': 'platform_done', 'platform': platform, 'count': counts[platform]})}\n\n"
+                    continue
 
                 # Save to database and send results
-                saved_jobs = []
-                for job_data in jobs:
-                    existing = db.query(Job).filter(Job.url == job_data["url"]).first()
-
-                    if existing:
-                        job = existing
-                    else:
-                        job = Job(
-                            id=str(uuid.uuid4()),
-                            title=job_data["title"],
-                            company=job_data["company"],
-                            location=job_data.get("location"),
-                            job_type=job_data.get("job_type"),
-                            salary_range=job_data.get("salary_range"),
-                            description=job_data.get("description"),
-                            url=job_data["url"],
-                            platform=job_data["platform"],
-                            posted_date=job_data.get("posted_date"),
-                        )
-                        db.add(job)
-
-                    saved_jobs.append(JobResponse.model_validate(job).model_dump())
-
-                db.commit()
-
-                # Send platform results
-                yield f"data: {json.dumps({'type': 'jobs', 'platform': platform, 'jobs': saved_jobs, 'count': len(saved_jobs)})}\n\n"
+                saved = await ingest(jobs, refresh=True)
+                description_prefetcher.enqueue(saved)
+
+                # Only top up stored matches to max_results
+                if request.local_first:
+                    saved = [job for job in saved if job.id not in sent[platform]]
+                    saved = saved[:max(0, request.max_results - counts[platform])]
+                    sent[platform].update(job.id for job in saved)
+                if request.collapse_duplicates:
+                    saved = [job for job in collapse_duplicates(saved) if job.canonical_id not in canonical_sent]
+                    canonical_sent.update(job.canonical_id for job in saved)
+                saved_jobs = [JobResponse.model_validate(job).model_dump() for job in saved]
+
+                # Send this batch of platform results
+                counts[platform] += len(saved_jobs)
+                yield f"data: {json.dumps({'type': 'jobs', 'platform': platform, 'jobs': saved_jobs, 'count': len(saved_jobs), 'cached': from_cache})}\n\n"
 
             # Send completion event
             yield f"data: {json.dumps({'type': 'done'})}\n\n"
@@ -132,7 +198,9 @@ async def search_jobs_stream(request: JobSearchRequest):
         except Exception as e:
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
         finally:
-            db.close()
+            # Stop pumping if the client went away; the shared scrape keeps running
+            for task in tasks:
+                task.cancel()
 
     return StreamingResponse(
         event_generator(),
@@ -141,37 +209,206 @@ async def search_jobs_stream(request: JobSearchRequest):
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
+            "X-Cache": cache_header(cached),
+            "X-Cache-Platforms": cache_platforms_header(cached),
+            **({"X-Local-Platforms": local_platforms_header(local)} if request.local_first else {}),
         }
     )
 
 
-async def scrape_linkedin(query: str, location: str | None, job_type: str) -> list[dict]:
+def search_key(platform: Platform, request: JobSearchRequest) -> str:
+    job_type = request.job_type.value if request.job_type else "all"
+    return make_search_key(platform.value, request.query, request.location, job_type, request.max_results)
+
+
+async def get_cached_results(request: JobSearchRequest) -> dict[Platform, list[dict] | None]:
+    """Look up each requested platform in the search cache (None on miss)."""
+    return {
+        platform: await search_cache.get(search_key(platform, request), platform.value, request.max_age)
+        for platform in request.platforms
+    }
+
+
+def cache_header(cached: dict[Platform, list[dict] | None]) -> str:
+    hits = sum(1 for jobs in cached.values() if jobs is not None)
+    if hits == 0:
+        return "MISS"
+    return "HIT" if hits == len(cached) else "PARTIAL"
+
+
+def cache_platforms_header(cached: dict[Platform, list[dict] | None]) -> str:
+    return ", ".join(
+        f"{platform.value}={'HIT' if jobs is not None else 'MISS'}"
+        for platform, jobs in cached.items()
+    )
+
+
+async def get_local_results(request: JobSearchRequest, db: AsyncSession) -> dict[Platform, list[Job]]:
+    """Stored jobs matching the search, per platform (only with local_first)."""
+    if not request.local_first:
+        return {}
+
+    job_type = request.job_type.value if request.job_type != JobType.ALL else None
+    local = {}
+    for platform in request.platforms:
+        jobs, _ = await search_local(
+            db, request.query, platform.value, job_type, request.location, request.max_results
+        )
+        if jobs:
+            local[platform] = jobs
+    return local
+
+
+def local_platforms_header(local: dict[Platform, list[Job]]) -> str:
+    return ", ".join(f"{platform.value}={len(jobs)}" for platform, jobs in local.items())
+
+
+def scrape_flight(platform: Platform, request: JobSearchRequest) -> Flight:
+    """Join (or start) the shared scrape for this platform and search.
+
+    The flight publishes jobs in micro-batches as cards are extracted and
+    caches the full, non-empty result at the end.
+    """
+    key = search_key(platform, request)
+    job_type = request.job_type.value if request.job_type else "all"
+
+    async def produce(flight: Flight) -> list[dict]:
+        jobs = []
+        scraped = SCRAPERS[platform](request.query, request.location, job_type, request.max_results)
+        async for batch in micro_batches(scraped, settings.stream_batch_size, settings.stream_batch_window):
+            flight.publish(batch)
+            jobs.extend(batch)
+        if jobs:
+            await search_cache.set(key, platform.value, jobs)
+        return jobs
+
+    return scrape_flights.join(key, produce)
+
+
+async def scrape_platform(platform: Platform, request: JobSearchRequest) -> list[dict]:
+    """Scrape one platform, sharing the work with identical in-flight searches."""
+    return await scrape_flight(platform, request).wait()
+
+
+def stream_linkedin(query: str, location: str | None, job_type: str, max_results: int) -> AsyncIterator[dict]:
     scraper = LinkedInScraper()
-    return await scraper.search_jobs(query, location, job_type)
+    return scraper.iter_jobs(query, location, job_type, max_results)
 
 
-async def scrape_glassdoor(query: str, location: str | None, job_type: str) -> list[dict]:
+def stream_glassdoor(query: str, location: str | None, job_type: str, max_results: int) -> AsyncIterator[dict]:
     scraper = GlassdoorScraper()
-    return await scraper.search_jobs(query, location, job_type)
+    return scraper.iter_jobs(query, location, job_type, max_results)
+
+
+SCRAPERS = {
+    Platform.LINKEDIN: stream_linkedin,
+    Platform.GLASSDOOR: stream_glassdoor,
+}
+
+
+@router.post("/details")
+async def get_jobs_details(request: JobDetailsRequest, db: AsyncSession = Depends(get_db)):
+    """Stream details for several jobs using Server-Sent Events.
+
+    Stored descriptions are sent first; missing ones are fetched concurrently
+    (one browser context per platform) and sent as each one completes.
+    """
+    job_ids = list(dict.fromkeys(request.job_ids))
+    jobs = {job.id: job for job in await db.scalars(select(Job).where(Job.id.in_(job_ids)))}
+    descriptions = await load_descriptions(db, list(jobs))
+
+    def job_event(job: Job, description: str | None, status: str) -> str:
+        response = JobResponse.model_validate(job)
+        response.description = description
+        return f"data: {json.dumps({'type': 'job', 'status': status, 'job': response.model_dump()})}\n\n"
+
+    async def event_generator():
+        for job_id in job_ids:
+            if job_id not in jobs:
+                yield f"data: {json.dumps({'type': 'not_found', 'job_id': job_id})}\n\n"
+            elif job_id in descriptions:
+                yield job_event(jobs[job_id], descriptions[job_id], "stored")
+
+        missing = [job for job_id, job in jobs.items() if job_id not in descriptions]
+        try:
+            async for job, description in description_prefetcher.fetch_many(missing):
+                yield job_event(job, description, "fetched" if description else "unavailable")
+            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+@router.get("", response_model=LocalSearchResponse)
+async def search_stored_jobs(
+    q: str = "",
+    platform: Optional[Platform] = None,
+    job_type: Optional[JobType] = None,
+    location: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    collapse: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text search over jobs already stored, without scraping.
+
+    Matches title, company, location and description, best match (BM25)
+    first; pass next_cursor back as cursor for the next page. collapse
+    returns one job per canonical_id.
+    """
+    try:
+        jobs, next_cursor = await search_local(
+            db,
+            q,
+            platform.value if platform else None,
+            job_type.value if job_type and job_type != JobType.ALL else None,
+            location,
+            limit,
+            cursor,
+            collapse,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return LocalSearchResponse(jobs=[JobResponse.model_validate(job) for job in jobs], next_cursor=next_cursor)
+
+
+@router.get("/by-skills", response_model=JobSearchResponse)
+async def get_jobs_by_skills(
+    skills: str = Query(..., description="Comma-separated skills, all required"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """Newest stored jobs whose descriptions mention every listed skill,
+    served from the job_skills index."""
+    names = [skill for skill in skills.split(",") if skill.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="No skills given")
+
+    jobs = await find_jobs_with_skills(db, names, limit)
+    return JobSearchResponse(jobs=[JobResponse.model_validate(job) for job in jobs], total=len(jobs))
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str, db: Session = Depends(get_db)):
-    job = db.query(Job).filter(Job.id == job_id).first()
+async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # If no description, try to fetch it
-    if not job.description:
-        if job.platform == "linkedin":
-            scraper = LinkedInScraper()
-            details = await scraper.get_job_details(job.url)
-        else:
-            scraper = GlassdoorScraper()
-            details = await scraper.get_job_details(job.url)
-
-        if details.get("description"):
-            job.description = details["description"]
-            db.commit()
+    # If no description yet, fetch it (or wait for the prefetch in flight)
+    description = await load_description(db, job.id)
+    if not description:
+        description = await description_prefetcher.fetch(job.id, job.platform, job.url)
 
-    return JobResponse.model_validate(job)
+    response = JobResponse.model_validate(job)
+    response.description = description
+    return response
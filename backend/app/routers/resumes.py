@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..schemas import ResumeUploadResponse
+from ..services.resumes import get_resume, store_resume
+
+router = APIRouter(prefix="/api/resumes", tags=["resumes"])
+
+
+@router.post("", response_model=ResumeUploadResponse)
+async def upload_resume(resume: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+    """Parse a resume once and return a resume_id to use for analyses."""
+    try:
+        stored = await store_resume(db, resume.filename, await resume.read())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ResumeUploadResponse(resume_id=stored.id, filename=stored.filename, characters=len(stored.text))
+
+
+@router.get("/{resume_id}", response_model=ResumeUploadResponse)
+async def get_resume_info(resume_id: str, db: AsyncSession = Depends(get_db)):
+    stored = await get_resume(db, resume_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    return ResumeUploadResponse(resume_id=stored.id, filename=stored.filename, characters=len(stored.text))
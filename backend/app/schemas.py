@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -23,6 +23,10 @@ class JobSearchRequest(BaseModel):
     salary_min: Optional[int] = None
     salary_max: Optional[int] = None
     platforms: list[Platform] = [Platform.LINKEDIN, Platform.GLASSDOOR]
+    max_results: int = Field(20, ge=1, le=1000)  # per platform
+    max_age: Optional[int] = None  # seconds; overrides the cache TTL, 0 forces a fresh scrape
+    local_first: bool = False  # serve stored matches first, scrape only to top up
+    collapse_duplicates: bool = False  # one job per canonical_id
 
 
 class JobResponse(BaseModel):
@@ -36,6 +40,7 @@ class JobResponse(BaseModel):
     url: str
     platform: str
     posted_date: Optional[str] = None
+    canonical_id: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -46,6 +51,23 @@ class JobSearchResponse(BaseModel):
     total: int
 
 
+class LocalSearchResponse(BaseModel):
+    jobs: list[JobResponse]
+    next_cursor: Optional[str] = None
+
+
+class JobDetailsRequest(BaseModel):
+    job_ids: list[str] = Field(..., min_length=1, max_length=100)
+
+
+class RankRequest(BaseModel):
+    resume_id: str  # from POST /api/resumes
+    job_ids: Optional[list[str]] = Field(None, min_length=1, max_length=500)
+    search: Optional[JobSearchRequest] = None  # rank the results of this search instead
+    top_k: Optional[int] = Field(None, ge=1)  # stop after this many results
+    min_match: int = Field(0, ge=0, le=100)  # only results scoring at least this count towards top_k
+
+
 class ResumeAnalysisRequest(BaseModel):
     job_id: str
 
@@ -60,3 +82,13 @@ class ResumeAnalysisResponse(BaseModel):
     matching_skills: list[str]
     missing_skills: list[str]
     recommendations: list[str]
+    local_score: Optional[float] = None  # keyword/skill pre-score, 0-100
+    llm_analyzed: bool = True  # False when the local score was below the gate
+    resume_id: Optional[str] = None  # reuse instead of uploading the file again
+    error: Optional[str] = None  # the AI failed partway; the values are those read before
+
+
+class ResumeUploadResponse(BaseModel):
+    resume_id: str
+    filename: Optional[str] = None
+    characters: int
@@ -1,43 +1,317 @@
 from abc import ABC, abstractmethod
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, Page
+from typing import AsyncContextManager, AsyncIterator, Callable, Optional
+from playwright.async_api import BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
 import asyncio
+import contextlib
+import math
+import random
+import urllib.parse
+
+from ..config import get_settings
+from .browser_pool import BrowserPool, browser_pool
+from .extraction import extract_cards
+from .network import get_blocking_profile
+
+# Card counts use the first selector that matches, like extract_cards()
+COUNT_CARDS_JS = """
+(selectors) => {
+    for (const selector of selectors) {
+        const count = document.querySelectorAll(selector).length;
+        if (count) return count;
+    }
+    return 0;
+}
+"""
+
+MORE_CARDS_JS = f"""
+([selectors, count]) => ({COUNT_CARDS_JS})(selectors) > count
+"""
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a job URL for deduplication: https, lowercase host, no query,
+    fragment or trailing slash."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path.rstrip("/") or "/"
+    return urllib.parse.urlunsplit(("https", parts.netloc.lower(), path, "", ""))
+
+
+async def merge_iterators(iterators: list[AsyncIterator], limit: int) -> AsyncIterator:
+    """Yield items from several async iterators as they arrive, running at most
+    `limit` of them at a time. The first error from any iterator is re-raised."""
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(limit)
+    done = object()
+
+    async def drain(iterator: AsyncIterator):
+        try:
+            async with semaphore:
+                async for item in iterator:
+                    await queue.put((item, None))
+        except Exception as e:
+            await queue.put((None, e))
+        finally:
+            await queue.put((done, None))
+
+    tasks = [asyncio.create_task(drain(iterator)) for iterator in iterators]
+    try:
+        pending = len(tasks)
+        while pending:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                pending -= 1
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Let the iterators finish closing (pages, tabs) before the caller
+        # releases what they were using
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 class BaseScraper(ABC):
-    def __init__(self):
-        self.browser: Optional[Browser] = None
+    PLATFORM: str = ""
+    CARD_SELECTORS: list[str] = []
+    CARD_FIELDS: dict[str, dict] = {}
+
+    MAX_RESULTS = 20  # default result cap
+    PAGE_SIZE = 25  # cards per results page
+    MAX_SCROLLS = 3  # scrolls per results page
+
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        self.pool = pool or browser_pool
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
 
+        settings = get_settings()
+        self.load_timeout_ms = settings.scraper_load_timeout * 1000
+        self.step_timeout_ms = settings.scraper_step_timeout * 1000
+        self.jitter = (settings.scraper_jitter_min, settings.scraper_jitter_max)
+        self.page_concurrency = settings.scraper_page_concurrency.get(self.PLATFORM, 1)
+
     async def init_browser(self):
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=True)
-        self.page = await self.browser.new_page()
-        self.page.set_default_timeout(60000)  # 60s timeout
-        await self.page.set_viewport_size({"width": 1920, "height": 1080})
-        await self.page.set_extra_http_headers({
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-        })
+        """Lease an isolated context from the shared browser pool."""
+        self.context = await self.pool.acquire()
+        profile = get_blocking_profile(self.PLATFORM)
+        if profile:
+            await profile.install(self.context)
+        self.page = await self.context.new_page()
 
     async def close_browser(self):
-        if self.browser:
-            await self.browser.close()
+        if self.context:
+            await self.pool.release(self.context)
+            self.context = None
+            self.page = None
 
     @abstractmethod
+    def _build_search_url(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        job_type: Optional[str] = None,
+        page: int = 0,
+    ) -> str:
+        pass
+
+    @abstractmethod
+    def _iter_page(self, url: str, job_type: Optional[str], limit: int) -> AsyncIterator[dict]:
+        """Open one results page in this scraper's context and yield its jobs."""
+
+    def _iter_pages(
+        self,
+        query: str,
+        location: Optional[str],
+        job_type: Optional[str],
+        max_results: int,
+    ) -> AsyncIterator[dict]:
+        """Yield jobs from every results page needed for max_results.
+
+        Pages are fetched concurrently, each in its own context, at most
+        page_concurrency at a time.
+        """
+        pages = math.ceil(max_results / self.PAGE_SIZE)
+        if pages <= 1:
+            return self._iter_page(
+                self._build_search_url(query, location, job_type), job_type, max_results
+            )
+
+        return merge_iterators(
+            [
+                type(self)(self.pool)._iter_page(
+                    self._build_search_url(query, location, job_type, page=page), job_type, self.PAGE_SIZE
+                )
+                for page in range(pages)
+            ],
+            self.page_concurrency,
+        )
+
+    async def iter_jobs(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        job_type: Optional[str] = None,
+        max_results: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Yield jobs one by one as soon as their cards are extracted,
+        deduplicated by canonical URL and capped at max_results."""
+        max_results = max_results or self.MAX_RESULTS
+        seen_urls = set()
+
+        jobs = self._iter_pages(query, location, job_type, max_results)
+        try:
+            async for job in jobs:
+                job["url"] = self.canonical_url(job["url"])
+                if job["url"] in seen_urls:
+                    continue
+                seen_urls.add(job["url"])
+                yield job
+                if len(seen_urls) >= max_results:
+                    break
+        finally:
+            await jobs.aclose()
+
+    def canonical_url(self, url: str) -> str:
+        return canonical_url(url)
+
     async def search_jobs(
         self,
         query: str,
         location: Optional[str] = None,
         job_type: Optional[str] = None,
+        max_results: Optional[int] = None,
     ) -> list[dict]:
-        pass
+        return [job async for job in self.iter_jobs(query, location, job_type, max_results)]
 
     @abstractmethod
+    async def _read_job_details(self, job_url: str) -> dict:
+        """Open a job page in self.page and return its details."""
+
     async def get_job_details(self, job_url: str) -> dict:
-        pass
+        details = {}
+
+        try:
+            await self.init_browser()
+            details = await self._read_job_details(job_url)
+        except Exception as e:
+            print(f"Error getting {self.PLATFORM} job details: {e}")
+        finally:
+            await self.close_browser()
+
+        return details
+
+    async def iter_job_details(
+        self,
+        job_urls: list[str],
+        each_page: Optional[Callable[[], AsyncContextManager]] = None,
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """Yield (url, details) for several jobs as each one completes.
+
+        Pages run up to page_concurrency at a time and share one leased
+        context while any of them is open. each_page (e.g. a concurrency slot
+        plus a rate limiter) is entered around each page, before the context
+        is leased: slots always come before contexts, as in a single fetch,
+        so a batch never pins a context while it waits for a slot. Failed
+        jobs yield empty details.
+        """
+        if not job_urls:
+            return
+
+        users = 0
+        lease_lock = asyncio.Lock()
+
+        @contextlib.asynccontextmanager
+        async def shared_context() -> AsyncIterator[BrowserContext]:
+            nonlocal users
+            async with lease_lock:
+                if not users:
+                    await self.init_browser()
+                users += 1
+            try:
+                yield self.context
+            finally:
+                async with lease_lock:
+                    users -= 1
+                    if not users:
+                        await self.close_browser()
+
+        async def read(job_url: str) -> AsyncIterator[tuple[str, dict]]:
+            # A sibling scraper drives its own tab in the shared context
+            tab = type(self)(self.pool)
+            details = {}
+            async with each_page() if each_page else contextlib.nullcontext():
+                try:
+                    async with shared_context() as context:
+                        tab.context = context
+                        try:
+                            tab.page = await context.new_page()
+                            details = await tab._read_job_details(job_url)
+                        finally:
+                            if tab.page:
+                                await tab.page.close()
+                except Exception as e:
+                    print(f"Error getting {self.PLATFORM} job details: {e}")
+            yield job_url, details
+
+        results = merge_iterators([read(url) for url in job_urls], self.page_concurrency)
+        try:
+            async for result in results:
+                yield result
+        finally:
+            await results.aclose()
+
+    async def wait_for_any(self, selectors: list[str], timeout_ms: Optional[float] = None) -> bool:
+        """Wait until any of the selectors is attached. Returns False on timeout."""
+        try:
+            await self.page.wait_for_selector(
+                ", ".join(selectors),
+                state="attached",
+                timeout=timeout_ms or self.step_timeout_ms,
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def scroll_for_more(self, selectors: list[str], count: int) -> bool:
+        """Scroll down and wait (one step timeout at most) for more than `count` cards."""
+        await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            await self.page.wait_for_function(
+                MORE_CARDS_JS,
+                arg=[selectors, count],
+                timeout=self.step_timeout_ms,
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def iter_page_cards(self, max_results: int, max_scrolls: int) -> AsyncIterator[dict]:
+        """Yield raw cards from the current page as they load.
+
+        Cards already on the page are extracted in one round trip, then we
+        scroll and extract only the new ones, until `max_results` cards are
+        seen or the count stops growing.
+        """
+        seen = 0
+        for scroll in range(max_scrolls + 1):
+            cards = await extract_cards(
+                self.page, self.CARD_SELECTORS, self.CARD_FIELDS, limit=max_results, offset=seen
+            )
+            seen += len(cards)
+            for card in cards:
+                yield card
+
+            if seen >= max_results or scroll == max_scrolls:
+                break
+            if not await self.scroll_for_more(self.CARD_SELECTORS, seen):
+                break  # No new cards loaded
+            await self.politeness_delay()
 
-    async def random_delay(self, min_seconds: float = 1, max_seconds: float = 3):
-        import random
-        delay = random.uniform(min_seconds, max_seconds)
-        await asyncio.sleep(delay)
+    async def politeness_delay(self):
+        """Optional random pause between page actions (scraper_jitter_min/max)."""
+        min_seconds, max_seconds = self.jitter
+        if max_seconds <= 0:
+            return
+        await asyncio.sleep(random.uniform(min_seconds, max(min_seconds, max_seconds)))
@@ -0,0 +1,170 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+import asyncio
+
+from ..config import get_settings
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+VIEWPORT = {"width": 1920, "height": 1080}
+DEFAULT_TIMEOUT_MS = 60000  # 60s timeout
+
+
+class _BrowserSlot:
+    """One Chromium process in the pool, handed out one context at a time."""
+
+    def __init__(self):
+        self.browser: Optional[Browser] = None
+        self.uses = 0
+
+
+class BrowserPool:
+    """Process-wide pool of headless Chromium browsers.
+
+    A single Playwright driver is started for the lifetime of the app. Each
+    lease gets a fresh, isolated BrowserContext on one of `size` browsers;
+    browsers are relaunched when they disconnect or after `max_uses` leases.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_uses: Optional[int] = None):
+        settings = get_settings()
+        self.size = size or settings.browser_pool_size
+        self.max_uses = max_uses or settings.browser_max_uses
+        self.launch_timeout = settings.browser_launch_timeout
+
+        self._playwright: Optional[Playwright] = None
+        self._slots: list[_BrowserSlot] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._leases: dict[BrowserContext, _BrowserSlot] = {}
+        self._lock = asyncio.Lock()
+        self._started = False
+
+        self.stats = {"leases": 0, "launches": 0, "recycled": 0, "unhealthy": 0}
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self):
+        async with self._lock:
+            if self._started:
+                return
+            self._playwright = await async_playwright().start()
+            self._slots = [_BrowserSlot() for _ in range(self.size)]
+            self._idle = asyncio.Queue()
+            for slot in self._slots:
+                self._idle.put_nowait(slot)
+            self._started = True
+            print(f"Browser pool started (size={self.size}, max_uses={self.max_uses})")
+
+    async def stop(self):
+        async with self._lock:
+            if not self._started:
+                return
+            self._started = False
+
+            for context in list(self._leases):
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._leases.clear()
+
+            for slot in self._slots:
+                await self._close_slot(slot)
+            self._slots = []
+            self._idle = None
+
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+            print("Browser pool stopped")
+
+    async def acquire(self) -> BrowserContext:
+        """Lease an isolated browser context. Must be returned with release()."""
+        if not self._started:
+            await self.start()
+
+        slot = await self._idle.get()
+        try:
+            await self._ensure_healthy(slot)
+            try:
+                context = await self._new_context(slot)
+            except Exception:
+                # Browser died between the health check and now: relaunch once
+                self.stats["unhealthy"] += 1
+                await self._close_slot(slot)
+                await self._ensure_healthy(slot)
+                context = await self._new_context(slot)
+        except BaseException:
+            self._idle.put_nowait(slot)
+            raise
+
+        slot.uses += 1
+        self.stats["leases"] += 1
+        self._leases[context] = slot
+        return context
+
+    async def release(self, context: BrowserContext):
+        slot = self._leases.pop(context, None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+        if slot is not None and self._started:
+            self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def lease(self):
+        context = await self.acquire()
+        try:
+            yield context
+        finally:
+            await self.release(context)
+
+    def status(self) -> dict:
+        return {
+            "started": self._started,
+            "size": self.size,
+            "in_use": len(self._leases),
+            "browsers": sum(1 for slot in self._slots if slot.browser is not None),
+            **self.stats,
+        }
+
+    async def _ensure_healthy(self, slot: _BrowserSlot):
+        if slot.browser is not None:
+            if not slot.browser.is_connected():
+                self.stats["unhealthy"] += 1
+                await self._close_slot(slot)
+            elif slot.uses >= self.max_uses:
+                self.stats["recycled"] += 1
+                await self._close_slot(slot)
+
+        if slot.browser is None:
+            slot.browser = await self._playwright.chromium.launch(
+                headless=True,
+                timeout=self.launch_timeout * 1000,
+            )
+            slot.uses = 0
+            self.stats["launches"] += 1
+
+    async def _new_context(self, slot: _BrowserSlot) -> BrowserContext:
+        context = await slot.browser.new_context(
+            user_agent=USER_AGENT,
+            viewport=VIEWPORT,
+            extra_http_headers={"Accept-Language": "en-US,en;q=0.9"},
+        )
+        context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+        return context
+
+    async def _close_slot(self, slot: _BrowserSlot):
+        if slot.browser is not None:
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+            slot.browser = None
+            slot.uses = 0
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,90 @@
+from typing import Optional
+from playwright.async_api import Page
+from selectolax.lexbor import LexborHTMLParser
+
+# A card field spec maps a field name to the selectors to try, in order, inside
+# each card and the attribute to read ("text" reads innerText), e.g.
+#   {"title": {"selectors": [".title", ".alt-title"]},
+#    "link": {"selectors": ["a"], "attr": "href"}}
+# The first selector that matches an element wins, like the old chains of
+# query_selector fallbacks.
+
+EXTRACT_CARDS_JS = """
+([cardSelectors, fields, offset, limit]) => {
+    let cards = [];
+    for (const selector of cardSelectors) {
+        cards = Array.from(document.querySelectorAll(selector));
+        if (cards.length) break;
+    }
+    cards = cards.slice(offset, limit || undefined);
+
+    return cards.map((card) => {
+        const row = {};
+        for (const [name, spec] of Object.entries(fields)) {
+            let value = null;
+            for (const selector of spec.selectors) {
+                const elem = card.querySelector(selector);
+                if (!elem) continue;
+                value = (spec.attr || "text") === "text"
+                    ? elem.innerText
+                    : elem.getAttribute(spec.attr);
+                break;
+            }
+            row[name] = value;
+        }
+        return row;
+    });
+}
+"""
+
+
+async def extract_cards(
+    page: Page,
+    card_selectors: list[str],
+    fields: dict[str, dict],
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> list[dict]:
+    """Extract every card on the page in a single page.evaluate round trip.
+
+    Only cards[offset:limit] are read, so callers can pick up newly loaded
+    cards after a scroll. Returns one dict per card with a key for each
+    field (None if no selector matched).
+    """
+    return await page.evaluate(EXTRACT_CARDS_JS, [card_selectors, fields, offset, limit])
+
+
+def extract_cards_html(
+    html: str,
+    card_selectors: list[str],
+    fields: dict[str, dict],
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> list[dict]:
+    """Same as extract_cards() but on static HTML, for browserless fetches.
+
+    Text fields use the element's textContent, so callers strip whitespace.
+    """
+    tree = LexborHTMLParser(html)
+
+    cards = []
+    for selector in card_selectors:
+        cards = tree.css(selector)
+        if cards:
+            break
+
+    rows = []
+    for card in cards[offset:limit]:
+        row = {}
+        for name, spec in fields.items():
+            value = None
+            for selector in spec["selectors"]:
+                elem = card.css_first(selector)
+                if elem is None:
+                    continue
+                attr = spec.get("attr", "text")
+                value = elem.text() if attr == "text" else elem.attributes.get(attr)
+                break
+            row[name] = value
+        rows.append(row)
+    return rows
@@ -1,17 +1,76 @@
-from typing import Optional
-from .base import BaseScraper
+from typing import AsyncIterator, Optional
+from .base import BaseScraper, merge_iterators
+import asyncio
+import math
+import re
 import urllib.parse
 
+# Absolute hrefs of the results-page links, in page order
+PAGINATION_LINKS_JS = """
+(selectors) => {
+    const links = [];
+    for (const selector of selectors) {
+        for (const elem of document.querySelectorAll(selector)) {
+            if (elem.href && !links.includes(elem.href)) links.push(elem.href);
+        }
+    }
+    return links;
+}
+"""
+
+# Results pages are numbered in the path ("..._IP2.htm") or the query (p=2)
+PAGE_PATH_RE = re.compile(r"_IP(\d+)\.htm$")
+PAGE_PARAMS = ("p", "page")
+
+
+def page_number(url: str) -> int:
+    """The results page a pagination link points to; 1 when it has no number."""
+    parts = urllib.parse.urlsplit(url)
+    match = PAGE_PATH_RE.search(parts.path)
+    if match:
+        return int(match.group(1))
+    params = urllib.parse.parse_qs(parts.query)
+    for name in PAGE_PARAMS:
+        if params.get(name, [""])[0].isdigit():
+            return int(params[name][0])
+    return 1
+
 
 class GlassdoorScraper(BaseScraper):
+    PLATFORM = "glassdoor"
     BASE_URL = "https://www.glassdoor.com/Job/jobs.htm"
 
+    PAGE_SIZE = 30
+    MAX_SCROLLS = 2
+    PAGINATION_SELECTORS = [
+        "[data-test='pagination'] a[href]",
+        "a[data-test^='pagination-link'][href]",
+        "nav[aria-label*='agination'] a[href]",
+    ]
+    DESCRIPTION_SELECTORS = ["[data-test='jobDescriptionContent']", ".JobDetails_jobDescription__"]
+
+    # Glassdoor uses various selectors; fallbacks are tried in order
+    CARD_SELECTORS = ["[data-test='jobListing']", ".JobCard_jobCard__"]
+    CARD_FIELDS = {
+        "title": {"selectors": ["[data-test='job-title']", ".JobCard_jobTitle__"]},
+        "company": {"selectors": ["[data-test='employer-short-name']", ".EmployerProfile_companyName__"]},
+        "location": {"selectors": ["[data-test='emp-location']", ".JobCard_location__"]},
+        "salary": {"selectors": ["[data-test='detailSalary']"]},
+        "link": {"selectors": ["a"], "attr": "href"},
+    }
+
+    # Set by _iter_pages(): resolved with the first page's pagination links
+    links_found: Optional[asyncio.Future] = None
+
     def _build_search_url(
         self,
         query: str,
         location: Optional[str] = None,
         job_type: Optional[str] = None,
+        page: int = 0,
     ) -> str:
+        # Later pages are followed from the page's own pagination links
+        # (see _iter_pages), so `page` is not encoded here
         params = {
             "sc.keyword": query,
         }
@@ -22,26 +81,56 @@ class GlassdoorScraper(BaseScraper):
 
         return f"{self.BASE_URL}?{urllib.parse.urlencode(params)}"
 
-    async def search_jobs(
+    def _iter_pages(
         self,
         query: str,
-        location: Optional[str] = None,
-        job_type: Optional[str] = None,
-    ) -> list[dict]:
-        jobs = []
-
+        location: Optional[str],
+        job_type: Optional[str],
+        max_results: int,
+    ) -> AsyncIterator[dict]:
+        """Yield jobs from the first results page and, as soon as its
+        pagination links are read, from pages 2..N concurrently with it."""
+        pages = math.ceil(max_results / self.PAGE_SIZE)
+        first = self._iter_page(
+            self._build_search_url(query, location, job_type), job_type, min(max_results, self.PAGE_SIZE)
+        )
+        if pages <= 1:
+            return first
+
+        self.links_found = asyncio.get_running_loop().create_future()
+
+        async def later_pages() -> AsyncIterator[dict]:
+            # Links are told apart by page number: one back to page 1 with
+            # other query params is still page 1
+            links = {}
+            for link in await self.links_found:
+                links.setdefault(page_number(link), link)
+            urls = [links[number] for number in sorted(links) if 1 < number <= pages]
+            async for job in merge_iterators(
+                [GlassdoorScraper(self.pool)._iter_page(url, job_type, self.PAGE_SIZE) for url in urls],
+                max(1, self.page_concurrency - 1),
+            ):
+                yield job
+
+        # Page 1 plus page_concurrency - 1 later pages at a time; with a
+        # concurrency of 1 the later pages wait for page 1 to finish
+        return merge_iterators([first, later_pages()], min(2, self.page_concurrency))
+
+    async def _iter_page(self, url: str, job_type: Optional[str], limit: int) -> AsyncIterator[dict]:
         try:
             await self.init_browser()
-            url = self._build_search_url(query, location, job_type)
             await self.page.goto(url, wait_until="domcontentloaded")
-            await self.random_delay(2, 4)
+
+            if not await self.wait_for_any(self.CARD_SELECTORS, self.load_timeout_ms):
+                print("Glassdoor: no job cards found")
+                return
 
             # Handle cookie consent if present
             try:
                 cookie_btn = await self.page.query_selector("#onetrust-accept-btn-handler")
                 if cookie_btn:
                     await cookie_btn.click()
-                    await self.random_delay(1, 2)
+                    await self.politeness_delay()
             except Exception:
                 pass
 
@@ -50,96 +139,73 @@ class GlassdoorScraper(BaseScraper):
                 close_btn = await self.page.query_selector("[data-test='close-modal']")
                 if close_btn:
                     await close_btn.click()
-                    await self.random_delay(0.5, 1)
+                    await self.politeness_delay()
             except Exception:
                 pass
 
-            # Scroll to load jobs
-            for _ in range(2):
-                await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await self.random_delay(1, 2)
-
-            # Get job cards - Glassdoor uses various selectors
-            job_cards = await self.page.query_selector_all("[data-test='jobListing']")
-
-            if not job_cards:
-                # Try alternative selector
-                job_cards = await self.page.query_selector_all(".JobCard_jobCard__")
-
-            for card in job_cards[:20]:  # Limit to 20 jobs
-                try:
-                    title_elem = await card.query_selector("[data-test='job-title']")
-                    if not title_elem:
-                        title_elem = await card.query_selector(".JobCard_jobTitle__")
-
-                    company_elem = await card.query_selector("[data-test='employer-short-name']")
-                    if not company_elem:
-                        company_elem = await card.query_selector(".EmployerProfile_companyName__")
-
-                    location_elem = await card.query_selector("[data-test='emp-location']")
-                    if not location_elem:
-                        location_elem = await card.query_selector(".JobCard_location__")
-
-                    salary_elem = await card.query_selector("[data-test='detailSalary']")
-
-                    link_elem = await card.query_selector("a")
-
-                    title = await title_elem.inner_text() if title_elem else ""
-                    company = await company_elem.inner_text() if company_elem else ""
-                    job_location = await location_elem.inner_text() if location_elem else ""
-                    salary = await salary_elem.inner_text() if salary_elem else None
-                    link = await link_elem.get_attribute("href") if link_elem else ""
-
-                    if title and link:
-                        full_url = link if link.startswith("http") else f"https://www.glassdoor.com{link}"
-                        jobs.append({
-                            "title": title.strip(),
-                            "company": company.strip(),
-                            "location": job_location.strip(),
-                            "url": full_url.split("?")[0],
-                            "posted_date": None,
-                            "platform": "glassdoor",
-                            "job_type": job_type if job_type != "all" else None,
-                            "salary_range": salary.strip() if salary else None,
-                            "description": None,
-                        })
-                except Exception:
-                    continue
+            if self.links_found and not self.links_found.done():
+                self.links_found.set_result(
+                    await self.page.evaluate(PAGINATION_LINKS_JS, self.PAGINATION_SELECTORS)
+                )
+
+            # Yield cards as they load, scrolling for more until we have enough
+            async for card in self.iter_page_cards(limit, self.MAX_SCROLLS):
+                job = self._parse_card(card, job_type)
+                if job:
+                    yield job
 
         except Exception as e:
             print(f"Glassdoor scraping error: {e}")
         finally:
+            if self.links_found and not self.links_found.done():
+                self.links_found.set_result([])
             await self.close_browser()
 
-        return jobs
+    def _parse_card(self, card: dict, job_type: Optional[str]) -> Optional[dict]:
+        title = card.get("title") or ""
+        company = card.get("company") or ""
+        job_location = card.get("location") or ""
+        salary = card.get("salary")
+        link = card.get("link") or ""
+
+        if not title or not link:
+            return None
+
+        full_url = link if link.startswith("http") else f"https://www.glassdoor.com{link}"
+        return {
+            "title": title.strip(),
+            "company": company.strip(),
+            "location": job_location.strip(),
+            "url": full_url.split("?")[0],
+            "posted_date": None,
+            "platform": "glassdoor",
+            "job_type": job_type if job_type != "all" else None,
+            "salary_range": salary.strip() if salary else None,
+            "description": None,
+        }
 
-    async def get_job_details(self, job_url: str) -> dict:
+    async def _read_job_details(self, job_url: str) -> dict:
         details = {}
 
-        try:
-            await self.init_browser()
-            await self.page.goto(job_url, wait_until="domcontentloaded")
-            await self.random_delay(2, 3)
-
-            # Handle modals
-            try:
-                close_btn = await self.page.query_selector("[data-test='close-modal']")
-                if close_btn:
-                    await close_btn.click()
-            except Exception:
-                pass
-
-            # Get job description
-            desc_elem = await self.page.query_selector("[data-test='jobDescriptionContent']")
-            if not desc_elem:
-                desc_elem = await self.page.query_selector(".JobDetails_jobDescription__")
+        await self.page.goto(job_url, wait_until="domcontentloaded")
+        await self.wait_for_any(self.DESCRIPTION_SELECTORS, self.load_timeout_ms)
 
+        # Handle modals
+        try:
+            close_btn = await self.page.query_selector("[data-test='close-modal']")
+            if close_btn:
+                await close_btn.click()
+        except Exception:
+            pass
+
+        # Get job description
+        desc_elem = None
+        for selector in self.DESCRIPTION_SELECTORS:
+            desc_elem = await self.page.query_selector(selector)
             if desc_elem:
-                details["description"] = await desc_elem.inner_text()
+                break
 
-        except Exception as e:
-            print(f"Error getting Glassdoor job details: {e}")
-        finally:
-            await self.close_browser()
+        if desc_elem:
+            details["description"] = await desc_elem.inner_text()
 
         return details
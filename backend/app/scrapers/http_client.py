@@ -0,0 +1,36 @@
+from typing import Optional
+import httpx
+
+from ..config import get_settings
+from .browser_pool import USER_AGENT
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """App-wide pooled HTTP client for browserless scraping."""
+    global _client
+
+    if _client is None or _client.is_closed:
+        settings = get_settings()
+        _client = httpx.AsyncClient(
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_connections,
+            ),
+            timeout=settings.http_timeout,
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,7 +1,18 @@
-from typing import Optional
-from .base import BaseScraper
+from typing import AsyncIterator, Optional
+from ..config import get_settings
+from .base import BaseScraper, canonical_url, merge_iterators
+from .extraction import extract_cards_html
+from .http_client import get_http_client
+import math
 import urllib.parse
 
+# Status codes LinkedIn uses when it refuses guest traffic
+BLOCKED_STATUSES = {403, 429, 999}
+
+
+class LinkedInBlocked(Exception):
+    pass
+
 
 def is_obfuscated(text: str) -> bool:
     """Check if text has been obfuscated by LinkedIn (replaced with asterisks)."""
@@ -13,20 +24,30 @@ def is_obfuscated(text: str) -> bool:
 
 
 class LinkedInScraper(BaseScraper):
+    PLATFORM = "linkedin"
     BASE_URL = "https://www.linkedin.com/jobs/search"
-
-    def _build_search_url(
+    # Guest API behind the public search page's infinite scroll: same
+    # base-card markup, 10 cards per request
+    GUEST_API_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+    GUEST_PAGE_SIZE = 10
+
+    PAGE_SIZE = 25  # LinkedIn pages results with start=25*n
+    CARD_SELECTORS = [".base-card"]
+    CARD_FIELDS = {
+        "title": {"selectors": [".base-search-card__title"]},
+        "company": {"selectors": [".base-search-card__subtitle"]},
+        "location": {"selectors": [".job-search-card__location"]},
+        "link": {"selectors": ["a.base-card__full-link"], "attr": "href"},
+        "posted_date": {"selectors": ["time"], "attr": "datetime"},
+    }
+
+    def _search_params(
         self,
         query: str,
         location: Optional[str] = None,
         job_type: Optional[str] = None,
-    ) -> str:
-        params = {
-            "keywords": query,
-            "trk": "public_jobs_jobs-search-bar_search-submit",
-            "position": 1,
-            "pageNum": 0,
-        }
+    ) -> dict:
+        params = {"keywords": query}
 
         if location:
             params["location"] = location
@@ -40,91 +61,161 @@ class LinkedInScraper(BaseScraper):
             if job_type in job_type_map:
                 params["f_WT"] = job_type_map[job_type]
 
+        return params
+
+    def _build_search_url(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        job_type: Optional[str] = None,
+        page: int = 0,
+    ) -> str:
+        params = {
+            **self._search_params(query, location, job_type),
+            "trk": "public_jobs_jobs-search-bar_search-submit",
+            "position": 1,
+            "pageNum": page,
+        }
+
+        if page:
+            params["start"] = page * self.PAGE_SIZE
+
         return f"{self.BASE_URL}?{urllib.parse.urlencode(params)}"
 
-    async def search_jobs(
+    def _build_guest_url(
         self,
         query: str,
         location: Optional[str] = None,
         job_type: Optional[str] = None,
-    ) -> list[dict]:
-        jobs = []
+        start: int = 0,
+    ) -> str:
+        params = {**self._search_params(query, location, job_type), "start": start}
+        return f"{self.GUEST_API_URL}?{urllib.parse.urlencode(params)}"
 
+    async def _iter_pages(
+        self,
+        query: str,
+        location: Optional[str],
+        job_type: Optional[str],
+        max_results: int,
+    ) -> AsyncIterator[dict]:
+        backend = get_settings().linkedin_backend
+
+        if backend in ("http", "auto"):
+            found = 0
+            try:
+                async for job in self._iter_http_pages(query, location, job_type, max_results):
+                    found += 1
+                    yield job
+            except Exception as e:
+                if backend == "http":
+                    print(f"LinkedIn HTTP scraping error: {e}")
+                    return
+                print(f"LinkedIn HTTP path failed ({e}), falling back to browser")
+                found = 0
+
+            if found or backend == "http":
+                return
+
+        # Browser path; iter_jobs drops anything the HTTP path already yielded
+        async for job in super()._iter_pages(query, location, job_type, max_results):
+            yield job
+
+    def _iter_http_pages(
+        self,
+        query: str,
+        location: Optional[str],
+        job_type: Optional[str],
+        max_results: int,
+    ) -> AsyncIterator[dict]:
+        pages = math.ceil(max_results / self.GUEST_PAGE_SIZE)
+        return merge_iterators(
+            [
+                self._iter_http_page(
+                    self._build_guest_url(query, location, job_type, start=page * self.GUEST_PAGE_SIZE),
+                    job_type,
+                )
+                for page in range(pages)
+            ],
+            self.page_concurrency,
+        )
+
+    async def _iter_http_page(self, url: str, job_type: Optional[str]) -> AsyncIterator[dict]:
+        response = await get_http_client().get(url)
+        if response.status_code in BLOCKED_STATUSES:
+            raise LinkedInBlocked(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+        for card in extract_cards_html(response.text, self.CARD_SELECTORS, self.CARD_FIELDS):
+            job = self._parse_card(card, job_type)
+            if job:
+                yield job
+
+    async def _iter_page(self, url: str, job_type: Optional[str], limit: int) -> AsyncIterator[dict]:
         try:
             await self.init_browser()
-            url = self._build_search_url(query, location, job_type)
             await self.page.goto(url, wait_until="domcontentloaded")
-            await self.random_delay(2, 4)
-
-            # Scroll to load more jobs
-            for _ in range(3):
-                await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await self.random_delay(1, 2)
-
-            # Get job cards
-            job_cards = await self.page.query_selector_all(".base-card")
-
-            for card in job_cards[:20]:  # Limit to 20 jobs
-                try:
-                    title_elem = await card.query_selector(".base-search-card__title")
-                    company_elem = await card.query_selector(".base-search-card__subtitle")
-                    location_elem = await card.query_selector(".job-search-card__location")
-                    link_elem = await card.query_selector("a.base-card__full-link")
-                    date_elem = await card.query_selector("time")
-
-                    title = await title_elem.inner_text() if title_elem else ""
-                    company = await company_elem.inner_text() if company_elem else ""
-                    job_location = await location_elem.inner_text() if location_elem else ""
-                    link = await link_elem.get_attribute("href") if link_elem else ""
-                    posted_date = await date_elem.get_attribute("datetime") if date_elem else ""
-
-                    title = title.strip()
-                    company = company.strip()
-
-                    # Skip obfuscated jobs (LinkedIn anti-scraping protection)
-                    if title and link and not is_obfuscated(title):
-                        jobs.append({
-                            "title": title,
-                            "company": company,
-                            "location": job_location.strip(),
-                            "url": link.split("?")[0] if link else "",
-                            "posted_date": posted_date,
-                            "platform": "linkedin",
-                            "job_type": job_type if job_type != "all" else None,
-                            "salary_range": None,
-                            "description": None,
-                        })
-                except Exception:
-                    continue
+
+            if not await self.wait_for_any(self.CARD_SELECTORS, self.load_timeout_ms):
+                print("LinkedIn: no job cards found")
+                return
+
+            # Yield cards as they load, scrolling for more until we have enough
+            async for card in self.iter_page_cards(limit, self.MAX_SCROLLS):
+                job = self._parse_card(card, job_type)
+                if job:
+                    yield job
 
         except Exception as e:
             print(f"LinkedIn scraping error: {e}")
         finally:
             await self.close_browser()
 
-        return jobs
+    def canonical_url(self, url: str) -> str:
+        # Country subdomains (fr.linkedin.com, ...) serve the same posting
+        url = canonical_url(url)
+        parts = urllib.parse.urlsplit(url)
+        if parts.netloc.endswith(".linkedin.com"):
+            url = urllib.parse.urlunsplit(parts._replace(netloc="www.linkedin.com"))
+        return url
+
+    def _parse_card(self, card: dict, job_type: Optional[str]) -> Optional[dict]:
+        title = (card.get("title") or "").strip()
+        company = (card.get("company") or "").strip()
+        job_location = card.get("location") or ""
+        link = card.get("link") or ""
+        posted_date = card.get("posted_date") or ""
+
+        # Skip obfuscated jobs (LinkedIn anti-scraping protection)
+        if not title or not link or is_obfuscated(title):
+            return None
+
+        return {
+            "title": title,
+            "company": company,
+            "location": job_location.strip(),
+            "url": link.split("?")[0],
+            "posted_date": posted_date,
+            "platform": "linkedin",
+            "job_type": job_type if job_type != "all" else None,
+            "salary_range": None,
+            "description": None,
+        }
 
-    async def get_job_details(self, job_url: str) -> dict:
+    async def _read_job_details(self, job_url: str) -> dict:
         details = {}
 
-        try:
-            await self.init_browser()
-            await self.page.goto(job_url, wait_until="domcontentloaded")
-            await self.random_delay(2, 3)
+        await self.page.goto(job_url, wait_until="domcontentloaded")
+        await self.wait_for_any([".description__text"], self.load_timeout_ms)
 
-            # Try to get job description
-            desc_elem = await self.page.query_selector(".description__text")
-            if desc_elem:
-                details["description"] = await desc_elem.inner_text()
+        # Try to get job description
+        desc_elem = await self.page.query_selector(".description__text")
+        if desc_elem:
+            details["description"] = await desc_elem.inner_text()
 
-            # Try to get salary if available
-            salary_elem = await self.page.query_selector(".salary")
-            if salary_elem:
-                details["salary_range"] = await salary_elem.inner_text()
-
-        except Exception as e:
-            print(f"Error getting job details: {e}")
-        finally:
-            await self.close_browser()
+        # Try to get salary if available
+        salary_elem = await self.page.query_selector(".salary")
+        if salary_elem:
+            details["salary_range"] = await salary_elem.inner_text()
 
         return details
@@ -0,0 +1,110 @@
+from typing import Optional
+from playwright.async_api import BrowserContext, Response, Route
+import urllib.parse
+
+from ..config import get_settings
+
+# We only read DOM text and hrefs, so heavy assets never need to be downloaded
+DEFAULT_BLOCKED_TYPES = {"image", "media", "font"}
+
+TRACKER_DOMAINS = [
+    "doubleclick.net",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "googlesyndication.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "bat.bing.com",
+    "hotjar.com",
+    "scorecardresearch.com",
+    "adsrvr.org",
+    "criteo.com",
+    "quantserve.com",
+    "newrelic.com",
+    "nr-data.net",
+]
+
+
+class BlockingProfile:
+    """Request-interception rules for scraper contexts, with request/byte counters."""
+
+    def __init__(
+        self,
+        blocked_types: set[str],
+        blocked_domains: list[str],
+    ):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = [d.lower().lstrip(".") for d in blocked_domains]
+        self.stats = {
+            "blocked_requests": 0,
+            "allowed_requests": 0,
+            "allowed_bytes": 0,
+            "blocked_by_type": {},
+        }
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_types:
+            return True
+
+        host = (urllib.parse.urlsplit(url).hostname or "").lower()
+        return any(host == d or host.endswith(f".{d}") for d in self.blocked_domains)
+
+    async def install(self, context: BrowserContext):
+        await context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+
+    async def _handle_route(self, route: Route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.stats["blocked_requests"] += 1
+            by_type = self.stats["blocked_by_type"]
+            by_type[request.resource_type] = by_type.get(request.resource_type, 0) + 1
+            await route.abort("blockedbyclient")
+        else:
+            self.stats["allowed_requests"] += 1
+            await route.continue_()
+
+    def _on_response(self, response: Response):
+        # Blocked requests are never downloaded, so only allowed bytes can be counted
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.stats["allowed_bytes"] += int(length)
+
+
+def _build_profiles() -> dict[str, BlockingProfile]:
+    settings = get_settings()
+    extra_domains = settings.scraper_blocked_domains
+
+    return {
+        # LinkedIn guest pages are plain markup, so stylesheets can go too
+        "linkedin": BlockingProfile(
+            blocked_types=DEFAULT_BLOCKED_TYPES | {"stylesheet"},
+            blocked_domains=TRACKER_DOMAINS + ["media.licdn.com", "px.ads.linkedin.com", "snap.licdn.com"] + extra_domains,
+        ),
+        # Glassdoor hides modals and duplicate labels with CSS; keep stylesheets
+        # so innerText matches what the selectors expect
+        "glassdoor": BlockingProfile(
+            blocked_types=DEFAULT_BLOCKED_TYPES,
+            blocked_domains=TRACKER_DOMAINS + ["media.glassdoor.com"] + extra_domains,
+        ),
+    }
+
+
+_profiles: Optional[dict[str, BlockingProfile]] = None
+
+
+def get_blocking_profile(platform: str) -> Optional[BlockingProfile]:
+    """Return the platform's profile, or None when resource blocking is disabled."""
+    global _profiles
+
+    if not get_settings().scraper_block_resources:
+        return None
+    if _profiles is None:
+        _profiles = _build_profiles()
+    return _profiles.get(platform)
+
+
+def blocking_stats() -> dict:
+    if _profiles is None:
+        return {}
+    return {platform: profile.stats for platform, profile in _profiles.items()}
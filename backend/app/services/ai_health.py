@@ -0,0 +1,186 @@
+from typing import Optional
+import asyncio
+import time
+
+import httpx
+
+from ..config import get_settings
+
+OLLAMA_URL = "http://localhost:11434"
+OPENROUTER_URL = "https://openrouter.ai/api/v1"
+
+# Backends in order of preference
+BACKENDS = ["ollama", "openrouter"]
+
+
+class CircuitBreaker:
+    """Skip a backend for `cooldown` seconds after `threshold` failures in a row.
+
+    Once the cooldown is over the breaker is half-open: calls are allowed
+    again, and the next failure re-opens it straight away.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allows(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+    def status(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "failures": self.failures,
+            "retry_in": round(self.cooldown - (time.monotonic() - self.opened_at), 1) if state == "open" else 0,
+        }
+
+
+class AIHealthMonitor:
+    """Probe the AI backends in the background and pick one without I/O.
+
+    Probe results are trusted for health_ttl seconds; a backend whose status
+    is stale (e.g. the monitor is not running) is assumed up and left to its
+    circuit breaker, which is fed by both probes and real calls.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.api_key = settings.open_router_api_key
+        self.interval = settings.ai_health_interval
+        self.ttl = settings.ai_health_ttl
+        self.breakers = {
+            backend: CircuitBreaker(settings.ai_breaker_threshold, settings.ai_breaker_cooldown)
+            for backend in BACKENDS
+        }
+
+        self._probes: dict[str, dict] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._selected: Optional[str] = None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._http = httpx.AsyncClient(timeout=2)
+        await self.probe_all()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def configured(self, backend: str) -> bool:
+        return backend != "openrouter" or bool(self.api_key)
+
+    def available(self, backend: str) -> bool:
+        if not self.configured(backend) or not self.breakers[backend].allows():
+            return False
+        probe = self._probes.get(backend)
+        if probe is None or time.monotonic() - probe["checked_at"] > self.ttl:
+            return True
+        return probe["healthy"]
+
+    def select_backend(self) -> str:
+        """Return the preferred available backend; no network calls."""
+        for backend in BACKENDS:
+            if self.available(backend):
+                break
+        else:
+            # Nothing looks healthy: still try the last configured backend
+            backend = next((b for b in reversed(BACKENDS) if self.configured(b)), None)
+            if backend is None:
+                raise ValueError("OPEN_ROUTER_API_KEY is not set and Ollama is not running")
+
+        if backend != self._selected:
+            if backend == "ollama":
+                print("Using Ollama (local) for AI")
+            else:
+                print("Ollama not available, using OpenRouter")
+            self._selected = backend
+        return backend
+
+    def record_success(self, backend: str):
+        self.breakers[backend].record_success()
+
+    def record_failure(self, backend: str):
+        self.breakers[backend].record_failure()
+
+    async def probe_all(self):
+        await asyncio.gather(*(self._probe(backend) for backend in BACKENDS if self.configured(backend)))
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        backends = {}
+        for backend in BACKENDS:
+            probe = self._probes.get(backend)
+            backends[backend] = {
+                "configured": self.configured(backend),
+                "available": self.available(backend),
+                "healthy": probe["healthy"] if probe else None,
+                "latency_ms": probe["latency_ms"] if probe else None,
+                "checked_ago": round(now - probe["checked_at"], 1) if probe else None,
+                "breaker": self.breakers[backend].status(),
+            }
+        return {"monitoring": self._task is not None, "selected": self._selected, "backends": backends}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe_all()
+            except Exception as e:
+                print(f"AI health probe error: {e}")
+
+    async def _probe(self, backend: str):
+        start = time.monotonic()
+        try:
+            if backend == "ollama":
+                response = await self._http.get(f"{OLLAMA_URL}/api/tags")
+            else:
+                response = await self._http.get(
+                    f"{OPENROUTER_URL}/models",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                )
+            healthy = response.status_code == 200
+        except Exception:
+            healthy = False
+
+        self._probes[backend] = {
+            "healthy": healthy,
+            "checked_at": time.monotonic(),
+            "latency_ms": round((time.monotonic() - start) * 1000, 1),
+        }
+        if healthy:
+            # A good probe doesn't cut an open breaker's cooldown short
+            if self.breakers[backend].state != "open":
+                self.breakers[backend].record_success()
+        else:
+            self.breakers[backend].record_failure()
+
+
+ai_health = AIHealthMonitor()
@@ -1,24 +1,19 @@
-from openai import OpenAI
-import json
-import re
-import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from typing import AsyncIterator, Optional
+import asyncio
+import contextlib
+import time
 from ..config import get_settings
+from .ai_health import OLLAMA_URL, OPENROUTER_URL, ai_health
+from .analysis_cache import analysis_cache, analysis_key
+from .analysis_stream import AnalysisNotFound, AnalysisStreamParser, analysis_events
 
+# Bump when the analysis prompt or result post-processing changes, so cached
+# results from the old prompt are not reused
+PROMPT_VERSION = 2
 
-def repair_json(text: str) -> str:
-    """Attempt to fix common JSON errors from LLMs."""
-    # Fix: array ending with } instead of ]
-    # Pattern: ["item1", "item2"}  ->  ["item1", "item2"]
-    text = re.sub(r'("\s*)\}(\s*[,\}])', r'\1]\2', text)
-
-    # Fix: missing comma between array items
-    text = re.sub(r'"\s*\n\s*"', '", "', text)
-
-    # Fix: trailing comma before closing bracket/brace
-    text = re.sub(r',\s*\]', ']', text)
-    text = re.sub(r',\s*\}', '}', text)
-
-    return text
+# Most items kept per list in an analysis
+ITEM_LIMITS = {"matching_skills": 10, "missing_skills": 10, "recommendations": 5}
 
 
 def truncate_text(text: str, max_chars: int = 4000) -> str:
@@ -28,51 +23,12 @@ def truncate_text(text: str, max_chars: int = 4000) -> str:
     return text[:max_chars] + "\n... [truncated for length]"
 
 
-def is_ollama_running() -> bool:
-    """Check if Ollama is running locally."""
-    try:
-        response = httpx.get("http://localhost:11434/api/tags", timeout=2)
-        return response.status_code == 200
-    except Exception:
-        return False
-
-
-class AIService:
-    def __init__(self):
-        self.ollama_available = is_ollama_running()
-
-        if self.ollama_available:
-            print("Using Ollama (local) for AI")
-            self.client = OpenAI(
-                base_url="http://localhost:11434/v1",
-                api_key="ollama",  # Ollama doesn't need a real key
-            )
-            self.model = "llama3.2"
-        else:
-            print("Ollama not available, using OpenRouter")
-            settings = get_settings()
-            api_key = settings.open_router_api_key
-
-            if not api_key:
-                raise ValueError("OPEN_ROUTER_API_KEY is not set and Ollama is not running")
-
-            self.client = OpenAI(
-                base_url="https://openrouter.ai/api/v1",
-                api_key=api_key,
-            )
-            self.model = "google/gemini-2.0-flash-exp:free"
-
-    async def analyze_resume_match(
-        self,
-        resume_text: str,
-        job_description: str,
-        job_title: str,
-    ) -> dict:
-        # Truncate inputs to reduce token usage
-        resume_truncated = truncate_text(resume_text, 3500)
-        job_truncated = truncate_text(job_description, 2500)
+def build_prompt(resume_text: str, job_description: str, job_title: str) -> str:
+    # Truncate inputs to reduce token usage
+    resume_truncated = truncate_text(resume_text, 3500)
+    job_truncated = truncate_text(job_description, 2500)
 
-        prompt = f"""You are an expert HR analyst. Analyze how well this resume matches the job posting.
+    return f"""You are an expert HR analyst. Analyze how well this resume matches the job posting.
 
 JOB TITLE: {job_title}
 
@@ -90,92 +46,194 @@ Respond with ONLY a valid JSON object (no markdown, no explanation, no text befo
     "recommendations": ["actionable tip 1", "actionable tip 2", "actionable tip 3"]
 }}"""
 
-        result_text = None
-        try:
-            print(f"Calling AI with model: {self.model}")
-            print(f"Prompt length: {len(prompt)} chars")
 
-            extra_headers = {}
-            extra_kwargs = {}
+def request_options(backend: str) -> dict:
+    """Extra arguments for chat.completions.create() on a backend."""
+    if backend == "openrouter":
+        return {
+            "extra_headers": {
+                "HTTP-Referer": "http://localhost:3000",
+                "X-Title": "Job Scraper",
+            }
+        }
+    # Ollama: longer timeout for complex prompts
+    return {"timeout": 120.0}
+
+
+def failed_analysis(message: str) -> dict:
+    return {
+        "match_percentage": 0,
+        "matching_skills": [],
+        "missing_skills": [],
+        "recommendations": [message],
+    }
+
+
+class AIService:
+    """App-scoped LLM client: Ollama when it runs locally, OpenRouter otherwise.
+
+    The backend is picked by the ai_health monitor. Both backends share one
+    pooled HTTP client, and each has its own limit on concurrent completions.
+    Calls are async, so cancelling the awaiting task aborts the request.
+    """
+
+    MODELS = {
+        "ollama": "llama3.2",
+        "openrouter": "google/gemini-2.0-flash-exp:free",
+    }
 
-            if not self.ollama_available:
-                extra_headers = {
-                    "HTTP-Referer": "http://localhost:3000",
-                    "X-Title": "Job Scraper",
-                }
-                extra_kwargs["extra_headers"] = extra_headers
+    def __init__(self):
+        settings = get_settings()
+        self.api_key = settings.open_router_api_key
+        self.limits = {
+            backend: asyncio.Semaphore(settings.ai_concurrency.get(backend, 1))
+            for backend in self.MODELS
+        }
+
+        self._http: Optional[DefaultAsyncHttpxClient] = None
+        self._clients: dict[str, AsyncOpenAI] = {}
+
+    @property
+    def http_client(self) -> DefaultAsyncHttpxClient:
+        if self._http is None:
+            self._http = DefaultAsyncHttpxClient()
+        return self._http
+
+    def client(self, backend: str) -> AsyncOpenAI:
+        if backend not in self._clients:
+            if backend == "ollama":
+                self._clients[backend] = AsyncOpenAI(
+                    base_url=f"{OLLAMA_URL}/v1",
+                    api_key="ollama",  # Ollama doesn't need a real key
+                    http_client=self.http_client,
+                )
             else:
-                # Ollama: longer timeout for complex prompts
-                extra_kwargs["timeout"] = 120.0
-
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                **extra_kwargs,
-            )
-
-            result_text = completion.choices[0].message.content
-            if result_text is None:
-                raise ValueError("AI returned empty response")
+                self._clients[backend] = AsyncOpenAI(
+                    base_url=OPENROUTER_URL,
+                    api_key=self.api_key,
+                    http_client=self.http_client,
+                )
+        return self._clients[backend]
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._clients = {}
+
+    async def analyze_resume_match(
+        self,
+        resume_text: str,
+        job_description: str,
+        job_title: str,
+        job_id: Optional[str] = None,
+    ) -> dict:
+        async with contextlib.aclosing(
+            self.stream_resume_match(resume_text, job_description, job_title, job_id)
+        ) as events:
+            async for event in events:
+                if event["type"] == "result":
+                    return event["analysis"]
+
+    async def stream_resume_match(
+        self,
+        resume_text: str,
+        job_description: str,
+        job_title: str,
+        job_id: Optional[str] = None,
+    ) -> AsyncIterator[dict]:
+        """Analyze a resume against a job, streaming the completion.
+
+        Yields match_percentage, matching_skill, missing_skill and
+        recommendation events as soon as the model has written each value,
+        then {"type": "result", "analysis": ...} made of those same values.
+        Closing the iterator aborts the request.
+        """
+        backend = ai_health.select_backend()
+        model = self.MODELS[backend]
+
+        key = analysis_key(resume_text, job_description, job_title, model, PROMPT_VERSION)
+        cached = await analysis_cache.get(key)
+        if cached is not None:
+            for event in analysis_events(cached):
+                yield event
+            yield {"type": "result", "analysis": cached}
+            return
+
+        prompt = build_prompt(resume_text, job_description, job_title)
+        parser = AnalysisStreamParser(ITEM_LIMITS)
+
+        chunks = []
+        started = time.perf_counter()
+        try:
+            print(f"Calling AI with model: {model}")
+            print(f"Prompt length: {len(prompt)} chars")
 
-            result_text = result_text.strip()
+            async with self.limits[backend]:
+                try:
+                    stream = await self.client(backend).chat.completions.create(
+                        model=model,
+                        messages=[
+                            {
+                                "role": "user",
+                                "content": prompt,
+                            }
+                        ],
+                        stream=True,
+                        **request_options(backend),
+                    )
+                    try:
+                        async for chunk in stream:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                chunks.append(delta)
+                                for event in parser.feed(delta):
+                                    yield event
+                    finally:
+                        await stream.close()
+                except Exception:
+                    ai_health.record_failure(backend)
+                    raise
+                ai_health.record_success(backend)
+
+            result_text = "".join(chunks).strip()
+            if not result_text:
+                raise ValueError("AI returned empty response")
             print(f"AI response received: {len(result_text)} chars")
             print(f"Response preview: {result_text[:200]}...")
 
-            # Clean up markdown if present
-            if result_text.startswith("```"):
-                parts = result_text.split("```")
-                if len(parts) >= 2:
-                    result_text = parts[1]
-                    if result_text.startswith("json"):
-                        result_text = result_text[4:]
-                    result_text = result_text.strip()
-
-            # Try to find JSON in the response
-            if not result_text.startswith("{"):
-                # Look for JSON object in the text
-                start = result_text.find("{")
-                end = result_text.rfind("}") + 1
-                if start != -1 and end > start:
-                    result_text = result_text[start:end]
-
-            # Try to repair common JSON errors from LLMs
-            result_text = repair_json(result_text)
-
-            result = json.loads(result_text)
-
-            return {
-                "match_percentage": min(100, max(0, int(result.get("match_percentage", 0)))),
-                "matching_skills": result.get("matching_skills", [])[:10],
-                "missing_skills": result.get("missing_skills", [])[:10],
-                "recommendations": result.get("recommendations", [])[:5],
-            }
-
-        except json.JSONDecodeError as e:
+            analysis = parser.result()
+
+            # Only complete analyses are cached; a cut-off one keeps the
+            # values already streamed
+            if parser.done:
+                await analysis_cache.set(
+                    key,
+                    analysis,
+                    model=model,
+                    prompt_version=PROMPT_VERSION,
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                    job_id=job_id,
+                    job_description=job_description,
+                )
+
+        except AnalysisNotFound as e:
             print(f"JSON parsing error: {e}")
-            print(f"Raw response: {result_text[:1000] if result_text else 'N/A'}")
-            return {
-                "match_percentage": 0,
-                "matching_skills": [],
-                "missing_skills": [],
-                "recommendations": ["Unable to parse AI response. Please try again."],
-            }
+            print(f"Raw response: {''.join(chunks)[:1000] or 'N/A'}")
+            analysis = failed_analysis("Unable to parse AI response. Please try again.")
 
         except Exception as e:
             error_str = str(e)
-            error_type = type(e).__name__
-            print(f"AI error ({error_type}): {error_str}")
-            if result_text:
-                print(f"Partial response: {result_text[:500]}")
-
-            return {
-                "match_percentage": 0,
-                "matching_skills": [],
-                "missing_skills": [],
-                "recommendations": [f"AI error: {error_str[:100]}"],
-            }
+            print(f"AI error ({type(e).__name__}): {error_str}")
+            if chunks:
+                print(f"Partial response: {''.join(chunks)[:500]}")
+            if parser.found:
+                # Keep the values already streamed rather than contradict them
+                analysis = {**parser.result(), "error": f"AI error: {error_str[:100]}"}
+            else:
+                analysis = failed_analysis(f"AI error: {error_str[:100]}")
+
+        yield {"type": "result", "analysis": analysis}
+
+
+ai_service = AIService()
@@ -0,0 +1,162 @@
+from typing import Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import hashlib
+import json
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import AnalysisCacheEntry
+
+LOOKUP_CHUNK = 500
+
+
+def text_hash(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def analysis_key(
+    resume_text: str,
+    job_description: str,
+    job_title: str,
+    model: str,
+    prompt_version: int,
+) -> str:
+    """Cache key for one analysis; resume whitespace differences don't matter."""
+    normalized_resume = " ".join(resume_text.split())
+    return text_hash(json.dumps(
+        [normalized_resume, job_description, job_title, model, prompt_version]
+    ))
+
+
+class AnalysisCache:
+    """SQLite cache of LLM analysis results, bounded by the size of their JSON.
+
+    Least recently used entries are evicted first. Entries for a job are
+    dropped when its description changes (see invalidate_sync).
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.analysis_cache_enabled
+        self.max_bytes = settings.analysis_cache_max_bytes
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "saved_ms": 0.0,
+        }
+
+    async def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        try:
+            async with SessionLocal() as db:
+                entry = await db.get(AnalysisCacheEntry, key)
+                if entry is None:
+                    self.stats["misses"] += 1
+                    return None
+                await db.execute(
+                    update(AnalysisCacheEntry)
+                    .where(AnalysisCacheEntry.key == key)
+                    .values(last_used_at=func.now())
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"Analysis cache read error: {e}")
+            return None
+
+        self.stats["hits"] += 1
+        self.stats["saved_ms"] += entry.latency_ms
+        return json.loads(entry.result)
+
+    async def set(
+        self,
+        key: str,
+        result: dict,
+        model: str,
+        prompt_version: int,
+        latency_ms: float,
+        job_id: Optional[str] = None,
+        job_description: Optional[str] = None,
+    ):
+        if not self.enabled:
+            return
+        payload = json.dumps(result)
+        values = {
+            "key": key,
+            "job_id": job_id,
+            "description_hash": text_hash(job_description),
+            "model": model,
+            "prompt_version": prompt_version,
+            "result": payload,
+            "size": len(payload),
+            "latency_ms": latency_ms,
+        }
+        try:
+            async with SessionLocal() as db:
+                if db.bind.dialect.name == "sqlite":
+                    stmt = sqlite_insert(AnalysisCacheEntry).values(**values)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[AnalysisCacheEntry.key],
+                        set_={**{k: stmt.excluded[k] for k in values if k != "key"}, "last_used_at": func.now()},
+                    )
+                    await db.execute(stmt)
+                else:
+                    await db.merge(AnalysisCacheEntry(**values))
+                await db.run_sync(self._evict_sync)
+                await db.commit()
+            self.stats["stores"] += 1
+        except Exception as e:
+            print(f"Analysis cache write error: {e}")
+
+    def invalidate_sync(self, db: Session, descriptions: dict[str, str]):
+        """Drop entries computed from an older description of these jobs. The caller commits."""
+        hashes = {job_id: text_hash(text) for job_id, text in descriptions.items()}
+        job_ids = list(hashes)
+
+        stale = []
+        for start in range(0, len(job_ids), LOOKUP_CHUNK):
+            rows = db.execute(
+                select(AnalysisCacheEntry.key, AnalysisCacheEntry.job_id, AnalysisCacheEntry.description_hash)
+                .where(AnalysisCacheEntry.job_id.in_(job_ids[start:start + LOOKUP_CHUNK]))
+            )
+            stale.extend(key for key, job_id, description_hash in rows if description_hash != hashes[job_id])
+
+        for start in range(0, len(stale), LOOKUP_CHUNK):
+            db.execute(delete(AnalysisCacheEntry).where(AnalysisCacheEntry.key.in_(stale[start:start + LOOKUP_CHUNK])))
+        self.stats["invalidations"] += len(stale)
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_bytes": self.max_bytes,
+            **self.stats,
+            "saved_ms": round(self.stats["saved_ms"], 1),
+        }
+
+    def _evict_sync(self, db: Session):
+        total = db.scalar(select(func.coalesce(func.sum(AnalysisCacheEntry.size), 0)))
+        if total <= self.max_bytes:
+            return
+
+        # Walk from least recently used until enough bytes are freed
+        evict = []
+        rows = db.execute(
+            select(AnalysisCacheEntry.key, AnalysisCacheEntry.size)
+            .order_by(AnalysisCacheEntry.last_used_at, AnalysisCacheEntry.created_at)
+        )
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evict.append(key)
+            total -= size
+
+        db.execute(delete(AnalysisCacheEntry).where(AnalysisCacheEntry.key.in_(evict)))
+        self.stats["evictions"] += len(evict)
+
+
+analysis_cache = AnalysisCache()
@@ -0,0 +1,146 @@
+from typing import Optional
+import json
+import re
+
+# Array fields of an analysis and the event sent for each of their items
+ITEM_EVENTS = {
+    "matching_skills": "matching_skill",
+    "missing_skills": "missing_skill",
+    "recommendations": "recommendation",
+}
+
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+class AnalysisNotFound(ValueError):
+    pass
+
+
+def percentage_event(value) -> Optional[dict]:
+    match = NUMBER_RE.search(str(value))
+    if not match:
+        return None
+    return {"type": "match_percentage", "value": min(100, max(0, int(float(match.group()))))}
+
+
+def analysis_events(analysis: dict) -> list[dict]:
+    """The events a streamed analysis would have produced, for a complete
+    (e.g. cached) one."""
+    events = [{"type": "match_percentage", "value": analysis["match_percentage"]}]
+    for field, event_type in ITEM_EVENTS.items():
+        events.extend({"type": event_type, "value": item} for item in analysis.get(field, []))
+    return events
+
+
+class AnalysisStreamParser:
+    """Incremental, tolerant parser for the analysis JSON an LLM streams.
+
+    feed() takes completion text as it arrives and returns an event for each
+    value completed so far: the match percentage and every array item (at
+    most limits[field] per array). Text before the first "{" (markdown
+    fences, prose) is skipped, and common LLM slips are accepted: arrays
+    closed with "}", items missing commas, trailing commas, "85%".
+
+    result() is the analysis made of exactly the values sent as events, so
+    the final result never contradicts what was streamed.
+    """
+
+    def __init__(self, limits: dict[str, int]):
+        self.limits = limits
+        self.analysis: dict = {"match_percentage": 0, **{field: [] for field in ITEM_EVENTS}}
+        self.found = False  # saw at least one analysis field
+        self.stack: list[str] = []  # open "{" and "["
+        self.key: Optional[str] = None  # last key of the top-level object
+        self.after_colon = False  # reading a top-level value rather than a key
+        self.string: Optional[list[str]] = None  # characters of the string being read
+        self.escaped = False
+        self.scalar = ""  # bare top-level value being read (numbers)
+        self.sent_percentage = False
+        self.done = False  # top-level object closed, i.e. the text wasn't cut off
+
+    def feed(self, text: str) -> list[dict]:
+        events: list[dict] = []
+        for char in text:
+            if self.done:
+                break
+
+            if self.string is not None:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self._end_string(events)
+                    continue
+                self.string.append(char)
+                continue
+
+            if not self.stack:
+                if char == "{":
+                    self.stack.append(char)
+                continue
+
+            if char == '"':
+                self.string = []
+            elif char in "{[":
+                self.stack.append(char)
+            elif char in "}]":
+                # "}" also closes an open array, the usual LLM slip
+                self._end_scalar(events)
+                self.stack.pop()
+                if len(self.stack) == 1:
+                    self.after_colon = False
+                self.done = not self.stack
+            elif len(self.stack) == 1:
+                if char == ":":
+                    self.after_colon = True
+                elif char == ",":
+                    self._end_scalar(events)
+                    self.after_colon = False
+                elif char.isspace():
+                    self._end_scalar(events)
+                elif self.after_colon:
+                    self.scalar += char
+        return events
+
+    def _end_string(self, events: list[dict]):
+        raw = "".join(self.string)
+        self.string = None
+        try:
+            value = json.loads(f'"{raw}"')
+        except ValueError:
+            value = raw
+
+        if len(self.stack) == 1:
+            if not self.after_colon:
+                self.key = value
+                self.found = self.found or value in self.analysis
+            else:
+                self._top_level_value(value, events)
+                self.after_colon = False
+        elif self.stack == ["{", "["] and self.key in ITEM_EVENTS:
+            value = value.strip()
+            items = self.analysis[self.key]
+            if value and len(items) < self.limits.get(self.key, 0):
+                items.append(value)
+                events.append({"type": ITEM_EVENTS[self.key], "value": value})
+
+    def _end_scalar(self, events: list[dict]):
+        if self.scalar and len(self.stack) == 1:
+            self._top_level_value(self.scalar, events)
+        self.scalar = ""
+
+    def _top_level_value(self, value, events: list[dict]):
+        if self.key == "match_percentage" and not self.sent_percentage:
+            event = percentage_event(value)
+            if event:
+                self.sent_percentage = True
+                self.analysis["match_percentage"] = event["value"]
+                events.append(event)
+
+    def result(self) -> dict:
+        """The analysis read so far. Raises AnalysisNotFound if the text had
+        no analysis field at all."""
+        if not self.found:
+            raise AnalysisNotFound("No analysis object in AI response")
+        return {key: list(value) if isinstance(value, list) else value for key, value in self.analysis.items()}
@@ -0,0 +1,54 @@
+from typing import Any, AsyncIterator
+import asyncio
+
+_DONE = object()
+
+
+async def micro_batches(items: AsyncIterator[Any], max_size: int, max_wait: float) -> AsyncIterator[list]:
+    """Group an async stream into lists of at most max_size items.
+
+    A batch is emitted as soon as it is full or max_wait seconds after its
+    first item arrived, whichever comes first. Errors from the source are
+    re-raised after the pending batch has been emitted.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for item in items:
+                await queue.put(item)
+        finally:
+            await queue.put(_DONE)
+
+    # Read the source in its own task so waiting for the window never
+    # cancels the source mid-item
+    task = asyncio.create_task(pump())
+    loop = asyncio.get_running_loop()
+
+    try:
+        batch: list = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if batch else None
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield batch
+                batch = []
+                continue
+
+            if item is _DONE:
+                break
+
+            batch.append(item)
+            if len(batch) == 1:
+                deadline = loop.time() + max_wait
+            if len(batch) >= max_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+        await task
+    finally:
+        task.cancel()
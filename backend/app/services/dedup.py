@@ -0,0 +1,261 @@
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.orm import Session
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+
+from ..models import Job, JobDescription, JobFingerprint
+
+# Fingerprints at most this many bits apart (out of 64) are near-duplicates
+MAX_DISTANCE = 3
+# Only clearly different descriptions veto a title/company/city match
+# (unrelated texts are 32 ± 4 bits apart)
+MAX_DESCRIPTION_DISTANCE = 20
+# 4 bands of 16 bits: two fingerprints within MAX_DISTANCE bits agree on at
+# least one whole band, so band lookups find every candidate
+BANDS = 4
+BAND_BITS = 64 // BANDS
+BAND_COLUMNS = [JobFingerprint.band0, JobFingerprint.band1, JobFingerprint.band2, JobFingerprint.band3]
+
+LOOKUP_CHUNK = 100  # jobs per candidate query (one IN list per band)
+
+WORD_RE = re.compile(r"[a-z0-9+#]+")
+# "(H/F)", "m/w/d" and friends added to titles by some job boards
+GENDER_MARKER_RE = re.compile(r"\b[hfmwdx](?:\s*/\s*[hfmwdx]){1,2}\b")
+ABBREVIATIONS = {"sr": "senior", "jr": "junior", "eng": "engineer", "dev": "developer"}
+COMPANY_SUFFIXES = frozenset(
+    "inc ltd llc gmbh sa sas sarl corp corporation co plc ag bv limited".split()
+)
+
+
+def words(text: Optional[str]) -> list[str]:
+    """Lowercase ASCII words, without accents."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    return WORD_RE.findall(text)
+
+
+def title_words(title: str) -> list[str]:
+    """Title words without gender markers, abbreviations spelled out."""
+    return [ABBREVIATIONS.get(word, word) for word in words(GENDER_MARKER_RE.sub(" ", title.lower()))]
+
+
+@lru_cache(maxsize=65536)
+def feature_hash(feature: str) -> int:
+    """Stable 64-bit hash (Python's hash() changes between runs)."""
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+def mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, applied to a uint64 array (wrapping arithmetic)."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def header_hashes(title: str, company: str, location: Optional[str]) -> np.ndarray:
+    """Hashes of the title words plus the normalized company and city (the
+    first part of the location, so "Paris" and "Paris, Île-de-France, France"
+    agree)."""
+    city = (location or "").split(",")[0]
+    company_words = [word for word in words(company) if word not in COMPANY_SUFFIXES]
+    features = (
+        [f"t:{word}" for word in title_words(title)]
+        + [f"c:{' '.join(company_words)}", f"l:{' '.join(words(city))}"]
+    )
+    return np.array([feature_hash(feature) for feature in features], dtype="<u8")
+
+
+def description_hashes(description: str) -> np.ndarray:
+    """Hashes of the overlapping 3-word shingles, built from cached word hashes."""
+    tokens = np.array([feature_hash(word) for word in words(description)] or [0], dtype="<u8")
+    if len(tokens) < 3:
+        return mix(tokens)
+    return mix(tokens[:-2] ^ mix(tokens[1:-1] ^ mix(tokens[2:])))
+
+
+def simhash(hashes: np.ndarray) -> int:
+    """64-bit SimHash: each bit is the majority vote of the feature hashes."""
+    if not len(hashes):
+        return 0
+    bits = np.unpackbits(hashes.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+
+
+def distance(a: int, b: int) -> int:
+    return ((a ^ b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+
+def bands(fingerprint: int) -> list[int]:
+    return [(fingerprint >> (BAND_BITS * i)) & ((1 << BAND_BITS) - 1) for i in range(BANDS)]
+
+
+def to_signed(fingerprint: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def link_duplicates_sync(db: Session, jobs: list[Job], descriptions: dict[str, str]) -> dict[str, str]:
+    """Fingerprint jobs seen for the first time and point each near-duplicate
+    at the canonical job of the closest match (earlier jobs and jobs earlier
+    in the list). descriptions ({job_id: text}) veto matches whose
+    descriptions differ when both are known.
+
+    A duplicate group holds at most one job per platform: the same posting
+    shows up on LinkedIn and Glassdoor, but within a platform two URLs are
+    two postings, however alike their title, company and city. Search cards
+    have no description, so the veto rarely applies at ingest and can't be
+    relied on to tell such postings apart.
+
+    Returns {job_id: canonical_id} for the newly linked duplicates. The caller
+    commits.
+    """
+    job_ids = [job.id for job in jobs]
+    fingerprinted = set()
+    for start in range(0, len(job_ids), LOOKUP_CHUNK * BANDS):
+        fingerprinted.update(db.scalars(
+            select(JobFingerprint.job_id).where(JobFingerprint.job_id.in_(job_ids[start:start + LOOKUP_CHUNK * BANDS]))
+        ))
+    new_jobs = [job for job in dict.fromkeys(jobs) if job.id not in fingerprinted]
+    if not new_jobs:
+        return {}
+
+    fingerprints = {}
+    by_platform: dict[str, list[Job]] = {}
+    for job in new_jobs:
+        header = simhash(header_hashes(job.title, job.company, job.location))
+        text = descriptions.get(job.id)
+        fingerprints[job.id] = (header, simhash(description_hashes(text)) if text else None)
+        by_platform.setdefault(job.platform, []).append(job)
+
+    # Candidates: stored jobs of other platforms sharing a band with a new
+    # fingerprint, bucketed by (platform, band, value)
+    index: dict[tuple[str, int, int], list[tuple[str, int, Optional[int], str]]] = {}
+    loaded = set()
+    for platform, platform_jobs in by_platform.items():
+        for start in range(0, len(platform_jobs), LOOKUP_CHUNK):
+            chunk = [bands(fingerprints[job.id][0]) for job in platform_jobs[start:start + LOOKUP_CHUNK]]
+            rows = db.execute(
+                select(
+                    JobFingerprint.job_id,
+                    JobFingerprint.simhash,
+                    JobFingerprint.description_simhash,
+                    Job.canonical_id,
+                    Job.platform,
+                    *BAND_COLUMNS,
+                )
+                .join(Job, Job.id == JobFingerprint.job_id)
+                .where(Job.platform != platform)
+                .where(or_(*(
+                    column.in_({values[i] for values in chunk}) for i, column in enumerate(BAND_COLUMNS)
+                )))
+            )
+            for job_id, header, description, canonical_id, candidate_platform, *row_bands in rows:
+                if job_id in loaded:
+                    continue
+                loaded.add(job_id)
+                for i, value in enumerate(row_bands):
+                    index.setdefault((candidate_platform, i, value), []).append(
+                        (job_id, header, description, canonical_id or job_id)
+                    )
+
+    # Platforms already in each candidate's duplicate group
+    group_platforms: dict[str, set[str]] = {}
+    groups = list({entry[3] for entries in index.values() for entry in entries})
+    for start in range(0, len(groups), LOOKUP_CHUNK * BANDS):
+        for canonical_id, platform in db.execute(
+            select(Job.canonical_id, Job.platform)
+            .where(Job.canonical_id.in_(groups[start:start + LOOKUP_CHUNK * BANDS]))
+            .distinct()
+        ):
+            group_platforms.setdefault(canonical_id, set()).add(platform)
+
+    platforms = {platform for platform, _, _ in index} | set(by_platform)
+    links = {}
+    rows = []
+    for job in new_jobs:
+        header, description = fingerprints[job.id]
+        best = None
+        checked = set()
+        for platform in platforms - {job.platform}:
+            for i, value in enumerate(bands(header)):
+                for candidate_id, candidate_header, candidate_description, canonical_id in index.get((platform, i, value), []):
+                    # Candidates agreeing on several bands are listed once per band
+                    if candidate_id in checked:
+                        continue
+                    checked.add(candidate_id)
+                    gap = distance(header, candidate_header)
+                    if gap > MAX_DISTANCE or (best and gap >= best[0]):
+                        continue
+                    if job.platform in group_platforms.get(canonical_id, ()):
+                        continue
+                    if (
+                        description is not None
+                        and candidate_description is not None
+                        and distance(description, candidate_description) > MAX_DESCRIPTION_DISTANCE
+                    ):
+                        continue
+                    best = (gap, canonical_id)
+
+        canonical_id = best[1] if best else job.id
+        if canonical_id != job.id:
+            links[job.id] = canonical_id
+        group_platforms.setdefault(canonical_id, set()).add(job.platform)
+        for i, value in enumerate(bands(header)):
+            index.setdefault((job.platform, i, value), []).append((job.id, header, description, canonical_id))
+        rows.append({
+            "job_id": job.id,
+            "simhash": to_signed(header),
+            "description_simhash": to_signed(description) if description is not None else None,
+            **{f"band{i}": value for i, value in enumerate(bands(header))},
+        })
+
+    db.execute(insert(JobFingerprint), rows)
+    if links:
+        db.execute(update(Job), [{"id": job_id, "canonical_id": canonical_id} for job_id, canonical_id in links.items()])
+        # Bulk updates bypass the identity map
+        for job in new_jobs:
+            if job.id in links:
+                job.canonical_id = links[job.id]
+    return links
+
+
+def share_with_duplicates_sync(db: Session, descriptions: dict[str, str]) -> dict[str, str]:
+    """Add the duplicates (and canonical jobs) of the given jobs that have no
+    description yet, with the same text, so a posting is only fetched once."""
+    job_ids = list(descriptions)
+    canonical_ids: dict[str, str] = {}
+    for start in range(0, len(job_ids), LOOKUP_CHUNK * BANDS):
+        for job_id, canonical_id in db.execute(
+            select(Job.id, Job.canonical_id).where(Job.id.in_(job_ids[start:start + LOOKUP_CHUNK * BANDS]))
+        ):
+            canonical_ids.setdefault(canonical_id or job_id, job_id)
+
+    groups = list(canonical_ids)
+    shared = dict(descriptions)
+    for start in range(0, len(groups), LOOKUP_CHUNK * BANDS):
+        rows = db.execute(
+            select(Job.id, Job.canonical_id)
+            .outerjoin(JobDescription, JobDescription.job_id == Job.id)
+            .where(Job.canonical_id.in_(groups[start:start + LOOKUP_CHUNK * BANDS]))
+            .where(JobDescription.job_id.is_(None))
+        )
+        for job_id, canonical_id in rows:
+            shared.setdefault(job_id, descriptions[canonical_ids[canonical_id]])
+    return shared
+
+
+def update_description_fingerprints_sync(db: Session, descriptions: dict[str, str]):
+    """Store the description SimHash of jobs whose description was saved."""
+    values = [
+        {"job_id": job_id, "description_simhash": to_signed(simhash(description_hashes(text)))}
+        for job_id, text in descriptions.items()
+    ]
+    if values:
+        db.execute(update(JobFingerprint), values)
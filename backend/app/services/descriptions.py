@@ -0,0 +1,83 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import zlib
+
+from ..models import JobDescription
+from .analysis_cache import analysis_cache
+from .dedup import share_with_duplicates_sync, update_description_fingerprints_sync
+from .job_skills import save_job_skills_sync
+from .local_search import index_descriptions_sync
+
+CODEC = "zlib"
+COMPRESSION_LEVEL = 6
+LOOKUP_CHUNK = 500
+
+
+def compress_description(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_description(content: bytes, codec: str = CODEC) -> str:
+    if codec != "zlib":
+        raise ValueError(f"Unsupported description codec: {codec}")
+    return zlib.decompress(content).decode("utf-8")
+
+
+def description_values(job_id: str, text: str) -> dict:
+    return {"job_id": job_id, "content": compress_description(text), "codec": CODEC}
+
+
+def save_descriptions_sync(db: Session, descriptions: dict[str, str]):
+    """Upsert {job_id: text} descriptions, their extracted skills, full-text
+    index entries and fingerprints. Duplicates of these jobs that have no
+    description yet get the same one. The caller commits."""
+    descriptions = {job_id: text for job_id, text in descriptions.items() if text}
+    if descriptions:
+        descriptions = share_with_duplicates_sync(db, descriptions)
+    rows = [description_values(job_id, text) for job_id, text in descriptions.items()]
+    if not rows:
+        return
+
+    analysis_cache.invalidate_sync(db, descriptions)
+    save_job_skills_sync(db, descriptions)
+    update_description_fingerprints_sync(db, descriptions)
+
+    if db.get_bind().dialect.name == "sqlite":
+        previous = load_descriptions_sync(db, list(descriptions))
+        stmt = sqlite_insert(JobDescription)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobDescription.job_id],
+            set_={"content": stmt.excluded.content, "codec": stmt.excluded.codec},
+        )
+        db.execute(stmt, rows)
+        index_descriptions_sync(db, descriptions, previous)
+    else:
+        for values in rows:
+            db.merge(JobDescription(**values))
+
+
+async def save_description(db: AsyncSession, job_id: str, text: str):
+    await db.run_sync(save_descriptions_sync, {job_id: text})
+
+
+def load_descriptions_sync(db: Session, job_ids: list[str]) -> dict[str, str]:
+    descriptions = {}
+    for start in range(0, len(job_ids), LOOKUP_CHUNK):
+        result = db.execute(
+            select(JobDescription.job_id, JobDescription.content, JobDescription.codec)
+            .where(JobDescription.job_id.in_(job_ids[start:start + LOOKUP_CHUNK]))
+        )
+        for job_id, content, codec in result:
+            descriptions[job_id] = decompress_description(content, codec)
+    return descriptions
+
+
+async def load_descriptions(db: AsyncSession, job_ids: list[str]) -> dict[str, str]:
+    return await db.run_sync(load_descriptions_sync, job_ids)
+
+
+async def load_description(db: AsyncSession, job_id: str) -> Optional[str]:
+    return (await load_descriptions(db, [job_id])).get(job_id)
@@ -0,0 +1,130 @@
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import asyncio
+import uuid
+
+from ..database import SyncSessionLocal
+from ..models import Job
+from .dedup import link_duplicates_sync
+from .descriptions import load_descriptions_sync, save_descriptions_sync
+
+# Fields that change between scrapes of the same posting. Title, company and
+# location are indexed in jobs_fts and would need re-indexing if refreshed
+REFRESH_FIELDS = ("salary_range", "posted_date")
+
+# Stay under SQLite's default host parameter limit for IN (...) lookups
+LOOKUP_CHUNK = 500
+
+
+def job_values(job_data: dict) -> dict:
+    """Map a scraped job dict onto Job column values."""
+    job_id = str(uuid.uuid4())
+    return {
+        "id": job_id,
+        "canonical_id": job_id,
+        "title": job_data["title"],
+        "company": job_data["company"],
+        "location": job_data.get("location"),
+        "job_type": job_data.get("job_type"),
+        "salary_range": job_data.get("salary_range"),
+        "url": job_data["url"],
+        "platform": job_data["platform"],
+        "posted_date": job_data.get("posted_date"),
+    }
+
+
+def ingest_jobs(db: Session, jobs: list[dict], refresh: bool = False) -> list[Job]:
+    """Insert scraped jobs that are new (by url) and return the persisted rows.
+
+    Rows come back in input order, one per input job. With refresh=True,
+    existing rows get non-empty REFRESH_FIELDS values from the new scrape.
+    New near-duplicates of known jobs are linked to them (canonical_id).
+    The caller commits.
+    """
+    rows: dict[str, dict] = {}
+    for job_data in jobs:
+        if job_data.get("url") and job_data["url"] not in rows:
+            rows[job_data["url"]] = job_values(job_data)
+
+    if not rows:
+        return []
+
+    if db.get_bind().dialect.name == "sqlite":
+        stmt = sqlite_insert(Job)
+        if refresh:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Job.url],
+                set_={
+                    field: func.coalesce(stmt.excluded[field], getattr(Job, field))
+                    for field in REFRESH_FIELDS
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Job.url])
+        db.execute(stmt, list(rows.values()))
+    else:
+        existing = set(_select_by_url(db, Job.url, list(rows)))
+        new_rows = [values for url, values in rows.items() if url not in existing]
+        if new_rows:
+            db.execute(insert(Job), new_rows)
+        if refresh:
+            for url in existing:
+                changes = {f: rows[url][f] for f in REFRESH_FIELDS if rows[url][f] is not None}
+                if changes:
+                    db.execute(update(Job).where(Job.url == url).values(**changes))
+
+    # Bulk statements bypass the identity map, so make sure refreshed values are reloaded
+    persisted = {
+        job.url: job
+        for job in _select_by_url(db, Job, list(rows), populate_existing=refresh)
+    }
+
+    # Descriptions go to their own compressed table
+    descriptions = {
+        persisted[job_data["url"]].id: job_data["description"]
+        for job_data in jobs
+        if job_data.get("description") and job_data.get("url") in persisted
+    }
+    saved = [persisted[job_data["url"]] for job_data in jobs if job_data.get("url") in persisted]
+
+    # New duplicates reuse their canonical job's description instead of
+    # having their own fetched
+    links = link_duplicates_sync(db, saved, descriptions)
+    missing = {job_id: canonical_id for job_id, canonical_id in links.items() if job_id not in descriptions}
+    if missing:
+        known = load_descriptions_sync(db, list(set(missing.values())))
+        descriptions.update({
+            job_id: known[canonical_id] for job_id, canonical_id in missing.items() if canonical_id in known
+        })
+    save_descriptions_sync(db, descriptions)
+
+    return saved
+
+
+async def ingest(jobs: list[dict], refresh: bool = False) -> list[Job]:
+    """ingest_jobs() and commit, in a worker thread with its own session.
+
+    Fingerprinting, skill extraction, full-text rows and compression are
+    CPU-bound; in db.run_sync() they would run on the event loop and stall
+    every other request for the length of a large batch. The returned rows
+    are detached, with all their columns loaded.
+    """
+    return await asyncio.to_thread(_ingest_and_commit, jobs, refresh)
+
+
+def _ingest_and_commit(jobs: list[dict], refresh: bool) -> list[Job]:
+    with SyncSessionLocal() as db:
+        saved = ingest_jobs(db, jobs, refresh=refresh)
+        db.commit()
+    return saved
+
+
+def _select_by_url(db: Session, entity, urls: list[str], populate_existing: bool = False) -> list:
+    results = []
+    for start in range(0, len(urls), LOOKUP_CHUNK):
+        stmt = select(entity).where(Job.url.in_(urls[start:start + LOOKUP_CHUNK]))
+        if populate_existing:
+            stmt = stmt.execution_options(populate_existing=True)
+        results.extend(db.scalars(stmt))
+    return results
@@ -0,0 +1,78 @@
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models import Job, JobSkill
+from .skills import SKILLS, extract_skills
+
+LOOKUP_CHUNK = 500
+
+
+def skill_rows(job_id: str, text: str) -> list[dict]:
+    return [
+        {"job_id": job_id, "skill": skill, "mentions": mentions}
+        for skill, mentions in extract_skills(text).items()
+    ]
+
+
+def save_job_skills_sync(db: Session, descriptions: dict[str, str]):
+    """Replace the skills of each {job_id: description}. The caller commits."""
+    job_ids = list(descriptions)
+    for start in range(0, len(job_ids), LOOKUP_CHUNK):
+        db.execute(delete(JobSkill).where(JobSkill.job_id.in_(job_ids[start:start + LOOKUP_CHUNK])))
+
+    rows = [row for job_id, text in descriptions.items() for row in skill_rows(job_id, text)]
+    if rows:
+        db.execute(insert(JobSkill), rows)
+
+
+def normalize_skill(name: str) -> str:
+    """Map a user-supplied skill ("postgres", "python") to its display name."""
+    name = " ".join(name.split())
+    return SKILLS.get(name.lower(), name)
+
+
+async def find_jobs_with_skills(db: AsyncSession, skills: list[str], limit: int = 50) -> list[Job]:
+    """Newest jobs whose descriptions mention every one of skills."""
+    skills = list(dict.fromkeys(normalize_skill(skill) for skill in skills))
+    matching = (
+        select(JobSkill.job_id)
+        .where(JobSkill.skill.in_(skills))
+        .group_by(JobSkill.job_id)
+        .having(func.count() == len(skills))
+    )
+    result = await db.scalars(
+        select(Job).where(Job.id.in_(matching)).order_by(Job.created_at.desc()).limit(limit)
+    )
+    return list(result)
+
+
+async def load_job_skills(db: AsyncSession, job_ids: list[str]) -> dict[str, list[str]]:
+    """{job_id: skills}, most mentioned first; jobs without skills are left out."""
+    skills: dict[str, list[str]] = {}
+    for start in range(0, len(job_ids), LOOKUP_CHUNK):
+        result = await db.execute(
+            select(JobSkill.job_id, JobSkill.skill)
+            .where(JobSkill.job_id.in_(job_ids[start:start + LOOKUP_CHUNK]))
+            .order_by(JobSkill.job_id, JobSkill.mentions.desc(), JobSkill.skill)
+        )
+        for job_id, skill in result:
+            skills.setdefault(job_id, []).append(skill)
+    return skills
+
+
+def skills_in(text: str) -> list[str]:
+    """Skills mentioned in text, most mentioned first (like load_job_skills)."""
+    found = extract_skills(text)
+    return sorted(found, key=lambda skill: (-found[skill], skill))
+
+
+def skill_match(job_skills: list[str], resume_skills: set[str]) -> dict:
+    """matching_skills/missing_skills of a resume against a job's skills.
+    Empty if the job mentions no known skill, so the LLM's lists are kept."""
+    if not job_skills:
+        return {}
+    return {
+        "matching_skills": [skill for skill in job_skills if skill in resume_skills],
+        "missing_skills": [skill for skill in job_skills if skill not in resume_skills],
+    }
@@ -0,0 +1,151 @@
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+import math
+import re
+import sys
+
+import numpy as np
+
+from ..config import get_settings
+from .skills import SKILLS, extract_skills
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can
+could did do does doing for from had has have having he her his how i if in
+into is it its just may me more most must my no not of on once only or other
+our out over own same she should so some such than that the their them then
+there these they this those through to too under up very was we were what
+when where which while who will with would you your
+au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma
+mais me mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses
+son sur ta te tes toi ton tu un une vos votre vous est sont être avoir
+""".split())
+
+# Skills are counted under their display name, which folds aliases together
+# (postgres/postgresql) and keeps them apart from lowercase keywords
+SKILL_NAMES = frozenset(SKILLS.values())
+
+# Words of two or more characters, keeping tech suffixes like c++ and c#.
+# Joined words ("python/django", "node.js") are split: skills, including
+# joined ones like ci/cd and .net, come from extract_skills()
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]+")
+# One-word skill terms, left out of the keywords since they count as skills
+SKILL_WORDS = frozenset(term for term in SKILLS if TOKEN_RE.fullmatch(term))
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+@lru_cache(maxsize=8192)
+def term_counts(text: str) -> tuple[tuple[str, ...], tuple[int, ...]]:
+    """Keyword and skill counts of a text (terms, counts); skills are the
+    ones extract_skills() finds, so they agree with the skill index."""
+    keywords = Counter(tokenize(text))
+    for word in STOPWORDS.intersection(keywords) | SKILL_WORDS.intersection(keywords):
+        del keywords[word]
+    skills = extract_skills(text)
+
+    # Interned so cached texts share their term strings
+    return (
+        tuple(map(sys.intern, keywords)) + tuple(skills),
+        tuple(keywords.values()) + tuple(skills.values()),
+    )
+
+
+class LocalScorer:
+    """Cheap resume/job match score from shared vocabulary, no LLM involved.
+
+    Each job gets the TF-IDF cosine similarity between resume and description
+    and the share of the job's skills found in the resume; the score (0-100)
+    blends the two with skill_weight. All jobs of a batch are scored with a
+    few NumPy operations over (job, term) pairs.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.gate = settings.local_score_gate
+        self.skill_weight = settings.local_score_skill_weight
+
+    def score_many(self, resume_text: str, descriptions: list[str]) -> dict[str, np.ndarray]:
+        """Score one resume against many descriptions; returns arrays of
+        "score", "cosine" and "skill_overlap", one entry per description."""
+        n = len(descriptions)
+        per_doc = [term_counts(description or "") for description in descriptions]
+        all_terms = list(chain.from_iterable(terms for terms, _ in per_doc))
+        vocab = {term: index for index, term in enumerate(dict.fromkeys(all_terms))}
+        size = len(vocab)
+
+        d = np.repeat(np.arange(n), [len(terms) for terms, _ in per_doc])
+        t = np.fromiter(map(vocab.__getitem__, all_terms), dtype=np.int64, count=len(all_terms))
+        tf = np.fromiter(chain.from_iterable(counts for _, counts in per_doc), dtype=np.float64, count=len(all_terms))
+
+        resume = dict(zip(*term_counts(resume_text)))
+        in_resume = np.zeros(size, dtype=bool)
+        resume_tf = np.zeros(size)
+        for term, count in resume.items():
+            index = vocab.get(term)
+            if index is not None:
+                in_resume[index] = True
+                resume_tf[index] = count
+
+        # Smoothed IDF over the jobs plus the resume
+        docs = n + 1
+        df = np.bincount(t, minlength=size) + in_resume
+        idf = np.log((1 + docs) / (1 + df)) + 1
+
+        weights = (1 + np.log(tf)) * idf[t]
+        job_norms = np.sqrt(np.bincount(d, weights=weights * weights, minlength=n))
+
+        resume_weights = np.where(in_resume, (1 + np.log(np.maximum(resume_tf, 1))) * idf, 0.0)
+        # Resume terms no job mentions still count towards the resume's norm
+        unseen_idf = math.log((1 + docs) / 2) + 1
+        unseen = sum(((1 + math.log(count)) * unseen_idf) ** 2 for term, count in resume.items() if term not in vocab)
+        resume_norm = math.sqrt(float(resume_weights @ resume_weights) + unseen)
+
+        dots = np.bincount(d, weights=weights * resume_weights[t], minlength=n)
+        denominators = job_norms * resume_norm
+        cosine = np.divide(dots, denominators, out=np.zeros(n), where=denominators > 0)
+
+        is_skill = np.array([term in SKILL_NAMES for term in vocab], dtype=bool)
+        job_skills = np.bincount(d, weights=is_skill[t].astype(np.float64), minlength=n)
+        matched = np.bincount(d, weights=(is_skill & in_resume)[t].astype(np.float64), minlength=n)
+        # Jobs without any known skill fall back to the cosine score
+        overlap = np.divide(matched, job_skills, out=cosine.copy(), where=job_skills > 0)
+
+        score = 100 * (self.skill_weight * overlap + (1 - self.skill_weight) * cosine)
+        return {"score": np.round(score, 1), "cosine": cosine, "skill_overlap": overlap}
+
+    def score(self, resume_text: str, description: str) -> dict:
+        """Score a single job, with the skills matched and missing."""
+        scores = self.score_many(resume_text, [description])
+        resume_terms = set(term_counts(resume_text)[0])
+        job_skills = [term for term in term_counts(description)[0] if term in SKILL_NAMES]
+        return {
+            "score": float(scores["score"][0]),
+            "cosine": float(scores["cosine"][0]),
+            "skill_overlap": float(scores["skill_overlap"][0]),
+            "matching_skills": [skill for skill in job_skills if skill in resume_terms],
+            "missing_skills": [skill for skill in job_skills if skill not in resume_terms],
+        }
+
+    def passes_gate(self, score: float) -> bool:
+        """Whether a job scores high enough locally to be worth an LLM analysis."""
+        return score >= self.gate
+
+    def gated_analysis(self, local: dict) -> dict:
+        """Analysis result for a job that was not sent to the LLM."""
+        return {
+            "match_percentage": int(round(local["score"])),
+            "matching_skills": local["matching_skills"][:10],
+            "missing_skills": local["missing_skills"][:10],
+            "recommendations": [
+                "Your resume shares very little vocabulary with this job, so it was not sent for a full AI analysis."
+            ],
+            "local_score": local["score"],
+            "llm_analyzed": False,
+        }
+
+
+local_scorer = LocalScorer()
@@ -0,0 +1,145 @@
+from typing import Optional
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import base64
+import json
+import re
+
+from ..models import Job
+
+LOOKUP_CHUNK = 500
+
+TERM_RE = re.compile(r"\w+")
+
+# jobs_fts rows are keyed on job_search_keys.key, not jobs.rowid (which
+# VACUUM may renumber). Only descriptions are re-indexed after insert: a
+# change to a job's title, company or location must be re-indexed the same
+# way (ingest never updates them, see REFRESH_FIELDS).
+INDEX_SQL = "INSERT INTO jobs_fts (rowid, title, company, location, description) VALUES (?, ?, ?, ?, ?)"
+# Contentless FTS5 rows are removed by replaying the exact indexed values
+UNINDEX_SQL = (
+    "INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description) "
+    "VALUES ('delete', ?, ?, ?, ?, ?)"
+)
+
+
+def fts_query(query: str, location: Optional[str] = None) -> str:
+    """FTS5 MATCH expression: every word of query (the last one as a prefix)
+    and of location (in the location column only). User input is quoted, so
+    FTS5 operators and punctuation in it are never interpreted."""
+    terms = [f'"{term}"' for term in TERM_RE.findall(query.lower())]
+    if terms:
+        terms[-1] += "*"
+    terms += [f'location : "{term}"' for term in TERM_RE.findall((location or "").lower())]
+    return " ".join(terms)
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def index_descriptions_sync(db: Session, descriptions: dict[str, str], previous: dict[str, str]):
+    """Re-index jobs whose description changed from previous[job_id] (or none)
+    to descriptions[job_id]. SQLite only; the caller commits."""
+    job_ids = list(descriptions)
+    rows = []
+    for start in range(0, len(job_ids), LOOKUP_CHUNK):
+        rows.extend(db.execute(
+            text(
+                "SELECT job_search_keys.key, jobs.id, jobs.title, jobs.company, coalesce(jobs.location, '') "
+                "FROM jobs JOIN job_search_keys ON job_search_keys.job_id = jobs.id WHERE jobs.id IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": job_ids[start:start + LOOKUP_CHUNK]},
+        ))
+    if not rows:
+        return
+
+    conn = db.connection()
+    conn.exec_driver_sql(UNINDEX_SQL, [
+        (key, title, company, location, previous.get(job_id, ""))
+        for key, job_id, title, company, location in rows
+    ])
+    conn.exec_driver_sql(INDEX_SQL, [
+        (key, title, company, location, descriptions[job_id])
+        for key, job_id, title, company, location in rows
+    ])
+
+
+async def search_local(
+    db: AsyncSession,
+    query: str = "",
+    platform: Optional[str] = None,
+    job_type: Optional[str] = None,
+    location: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    collapse: bool = False,
+) -> tuple[list[Job], Optional[str]]:
+    """Search stored jobs, best BM25 match first (newest first without a
+    query). Returns a page of jobs and the cursor of the next page, if any.
+    With collapse, only the best match of each duplicate group is returned.
+
+    Needs the SQLite jobs_fts index; other databases get no results.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return [], None
+
+    params: dict = {"limit": limit + 1}
+    where = []
+    if platform:
+        where.append("jobs.platform = :platform")
+        params["platform"] = platform
+    if job_type:
+        where.append("jobs.job_type = :job_type")
+        params["job_type"] = job_type
+
+    # The inner query ranks every match; the outer one keeps the best job of
+    # each duplicate group (with collapse) and applies the keyset cursor
+    match = fts_query(query, location)
+    after = decode_cursor(cursor) if cursor else None
+    outer = ["rn = 1"] if collapse else []
+    if match:
+        where.insert(0, "jobs_fts MATCH :match")
+        params["match"] = match
+        order, group_order = "rank, key", "jobs_fts.rank, job_search_keys.key"
+        source = (
+            "jobs_fts JOIN job_search_keys ON job_search_keys.key = jobs_fts.rowid "
+            "JOIN jobs ON jobs.id = job_search_keys.job_id"
+        )
+        rank = "jobs_fts.rank"
+        if after:
+            outer.append("(rank > :rank OR (rank = :rank AND key > :key))")
+            params["rank"], params["key"] = after
+    else:
+        order, group_order = "key DESC", "job_search_keys.key DESC"
+        source = "jobs JOIN job_search_keys ON job_search_keys.job_id = jobs.id"
+        rank = "NULL"
+        if after:
+            outer.append("key < :key")
+            params["key"] = after[1]
+
+    sql = (
+        "SELECT id, rank, key FROM ("
+        f"SELECT jobs.id AS id, {rank} AS rank, job_search_keys.key AS key, "
+        f"row_number() OVER (PARTITION BY coalesce(jobs.canonical_id, jobs.id) ORDER BY {group_order}) AS rn "
+        f"FROM {source} {'WHERE ' + ' AND '.join(where) if where else ''}"
+        f") {'WHERE ' + ' AND '.join(outer) if outer else ''} ORDER BY {order} LIMIT :limit"
+    )
+
+    rows = (await db.execute(text(sql), params)).all()
+    next_cursor = encode_cursor(list(rows[limit - 1][1:])) if len(rows) > limit else None
+    rows = rows[:limit]
+
+    found = {job.id: job for job in await db.scalars(select(Job).where(Job.id.in_([row[0] for row in rows])))}
+    return [found[row[0]] for row in rows if row[0] in found], next_cursor
@@ -1,6 +1,9 @@
-from openai import OpenAI, APIError, AuthenticationError, RateLimitError
+from openai import AsyncOpenAI, APIError, AuthenticationError, RateLimitError
+import asyncio
 import json
 from ..config import get_settings
+from .ai_health import ai_health
+from .ai_service import ai_service
 
 
 def truncate_text(text: str, max_chars: int = 4000) -> str:
@@ -21,15 +24,19 @@ class OpenRouterService:
 
     def __init__(self):
         settings = get_settings()
-        api_key = settings.open_router_api_key
+        self.api_key = settings.open_router_api_key
 
-        if not api_key:
+    @property
+    def client(self) -> AsyncOpenAI:
+        """ai_service's OpenRouter client, on its pooled HTTP client (closed by ai_service)."""
+        if not self.api_key:
             raise ValueError("OPEN_ROUTER_API_KEY is not set in .env file")
+        return ai_service.client("openrouter")
 
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-        )
+    @property
+    def limit(self) -> asyncio.Semaphore:
+        """ai_service's OpenRouter concurrency limit, so both services share it."""
+        return ai_service.limits["openrouter"]
 
     async def analyze_resume_match(
         self,
@@ -59,26 +66,30 @@ Respond with ONLY a valid JSON object (no markdown, no explanation):
     "recommendations": ["actionable tip 1", "actionable tip 2", "actionable tip 3"]
 }}"""
 
+        client = self.client
+
         # Try each model until one works
         last_error = None
         for model in self.FREE_MODELS:
             try:
                 print(f"Trying model: {model}")
 
-                completion = self.client.chat.completions.create(
-                    extra_headers={
-                        "HTTP-Referer": "http://localhost:3000",
-                        "X-Title": "Job Scraper",
-                    },
-                    model=model,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": prompt,
-                        }
-                    ],
-                )
-
+                async with self.limit:
+                    completion = await client.chat.completions.create(
+                        extra_headers={
+                            "HTTP-Referer": "http://localhost:3000",
+                            "X-Title": "Job Scraper",
+                        },
+                        model=model,
+                        messages=[
+                            {
+                                "role": "user",
+                                "content": prompt,
+                            }
+                        ],
+                    )
+
+                ai_health.record_success("openrouter")
                 result_text = completion.choices[0].message.content.strip()
                 print(f"Success with {model}! Response: {len(result_text)} chars")
 
@@ -127,6 +138,7 @@ Respond with ONLY a valid JSON object (no markdown, no explanation):
                     last_error = error_msg
                     continue
                 print(f"API error: {e}")
+                ai_health.record_failure("openrouter")
                 return {
                     "match_percentage": 0,
                     "matching_skills": [],
@@ -151,3 +163,6 @@ Respond with ONLY a valid JSON object (no markdown, no explanation):
                 "Please try again in a few minutes, or add credits at openrouter.ai/settings/credits"
             ],
         }
+
+
+openrouter_service = OpenRouterService()
@@ -0,0 +1,287 @@
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import time
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import Job
+from ..scrapers.glassdoor import GlassdoorScraper
+from ..scrapers.linkedin import LinkedInScraper
+from .batching import micro_batches
+from .descriptions import load_descriptions, save_descriptions_sync
+from .singleflight import SingleFlight
+
+DETAIL_SCRAPERS = {
+    "linkedin": LinkedInScraper,
+    "glassdoor": GlassdoorScraper,
+}
+
+# Failed jobs are not queued again for this long (seconds)
+RETRY_AFTER = 3600
+MAX_FAILURES_TRACKED = 10_000
+
+
+class DescriptionPrefetcher:
+    """Fetch descriptions of newly ingested jobs in the background.
+
+    Jobs are queued after ingest; workers skip those that already have a
+    description, fetch the rest with bounded concurrency and a per-platform
+    rate limit, and write them back in batches. Request handlers call fetch(),
+    which joins the in-flight fetch for a job instead of starting another.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.prefetch_enabled
+        self.concurrency = settings.prefetch_concurrency
+        self.rates = settings.prefetch_rate_per_platform
+        self.write_batch = settings.prefetch_write_batch
+        self.write_window = settings.prefetch_write_window
+
+        self._queue: asyncio.Queue = asyncio.Queue(settings.prefetch_queue_size)
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._unwritten: dict[str, str] = {}
+        self._queued: set[str] = set()
+        self._failures: OrderedDict[str, float] = OrderedDict()
+        self._flights = SingleFlight()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._next_request: dict[str, float] = {}
+        self._rate_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+        self._fetches: set[asyncio.Task] = set()
+        self._batches: set[asyncio.Task] = set()
+
+        self.stats = {"fetched": 0, "failed": 0, "skipped": 0, "dropped": 0, "written": 0}
+
+    async def start(self):
+        if not self.enabled or self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._write()),
+        ]
+
+    async def stop(self):
+        """Cancel every fetch in flight, then the workers, and write the
+        descriptions still waiting for a batch; nothing leases a browser
+        context afterwards."""
+        fetches = [*self._fetches, *self._batches, *self._flights.tasks()]
+        for task in fetches:
+            task.cancel()
+        await asyncio.gather(*fetches, return_exceptions=True)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queued.clear()
+
+        pending, self._unwritten = self._unwritten, {}
+        self._results = asyncio.Queue()
+        if pending:
+            try:
+                await self._save(pending)
+                self.stats["written"] += len(pending)
+            except Exception as e:
+                print(f"Prefetch write error: {e}")
+
+    def enqueue(self, jobs: list[Job]):
+        """Queue jobs for prefetching without blocking; drops jobs when the queue is full.
+
+        Duplicates are skipped: their canonical job's description is shared
+        with them when it is saved.
+        """
+        if not self._tasks:
+            return
+        for job in jobs:
+            if job.id in self._queued or job.platform not in DETAIL_SCRAPERS:
+                continue
+            if job.canonical_id and job.canonical_id != job.id:
+                continue
+            failed_at = self._failures.get(job.id)
+            if failed_at is not None and time.time() - failed_at < RETRY_AFTER:
+                continue
+            try:
+                self._queue.put_nowait((job.id, job.platform, job.url))
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                continue
+            self._queued.add(job.id)
+
+    async def fetch(self, job_id: str, platform: str, url: str) -> Optional[str]:
+        """Return the job's scraped description, sharing any fetch already in flight."""
+        if job_id in self._unwritten:
+            return self._unwritten[job_id]
+        flight = self._flights.join(job_id, lambda _: self._fetch(job_id, platform, url))
+        return await flight.wait()
+
+    async def fetch_many(self, jobs: list[Job]) -> AsyncIterator[tuple[Job, Optional[str]]]:
+        """Yield (job, description) as each job's fetch completes.
+
+        Jobs already in flight are joined; the rest are fetched together, one
+        shared browser context per platform. Fetches keep running (and get
+        written) if the caller stops early.
+        """
+        loop = asyncio.get_running_loop()
+        futures: dict[str, asyncio.Future] = {}
+        new_jobs: dict[str, list[Job]] = {}
+
+        async def wait(job: Job, flight) -> tuple[Job, Optional[str]]:
+            return job, await flight.wait()
+
+        waits = []
+        for job in jobs:
+            if job.id in self._unwritten:
+                yield job, self._unwritten[job.id]
+                continue
+            flight = self._flights.get(job.id)
+            if flight is None:
+                future = futures[job.id] = loop.create_future()
+                flight = self._flights.join(job.id, lambda _, future=future: future)
+                new_jobs.setdefault(job.platform, []).append(job)
+            waits.append(asyncio.create_task(wait(job, flight)))
+
+        for platform, platform_jobs in new_jobs.items():
+            task = asyncio.create_task(self._fetch_platform(platform, platform_jobs, futures))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+        try:
+            for done in asyncio.as_completed(waits):
+                yield await done
+        finally:
+            for task in waits:
+                task.cancel()
+
+    def status(self) -> dict:
+        return {
+            "running": bool(self._tasks),
+            "queued": self._queue.qsize(),
+            "in_flight": self._flights.in_flight(),
+            "pending_writes": len(self._unwritten),
+            **self.stats,
+        }
+
+    @asynccontextmanager
+    async def _page_slot(self, platform: str) -> AsyncIterator[None]:
+        """Hold one of the concurrent fetch slots for one page, rate-limited."""
+        async with self._slots:
+            await self._wait_for_rate_limit(platform)
+            yield
+
+    async def _fetch(self, job_id: str, platform: str, url: str) -> Optional[str]:
+        async with self._page_slot(platform):
+            try:
+                details = await DETAIL_SCRAPERS[platform]().get_job_details(url)
+            except Exception as e:
+                print(f"Description fetch error for {url}: {e}")
+                details = {}
+
+        return await self._record(job_id, details.get("description"))
+
+    async def _fetch_platform(self, platform: str, jobs: list[Job], futures: dict[str, asyncio.Future]):
+        """Fetch several jobs of one platform in a single context, resolving their flights."""
+        by_url = {job.url: job for job in jobs}
+        try:
+            # Slots are taken per page, before the shared context, so a large
+            # batch holds neither for its whole (rate-limited) duration
+            details = DETAIL_SCRAPERS[platform]().iter_job_details(
+                list(by_url), each_page=lambda: self._page_slot(platform)
+            )
+            async for url, job_details in details:
+                job = by_url[url]
+                description = await self._record(job.id, job_details.get("description"))
+                futures[job.id].set_result(description)
+        except Exception as e:
+            print(f"Description fetch error for {platform}: {e}")
+        finally:
+            for job in jobs:
+                if not futures[job.id].done():
+                    futures[job.id].set_result(None)
+
+    async def _record(self, job_id: str, description: Optional[str]) -> Optional[str]:
+        """Count a finished fetch and queue its description for writing."""
+        if not description:
+            self.stats["failed"] += 1
+            self._failures[job_id] = time.time()
+            while len(self._failures) > MAX_FAILURES_TRACKED:
+                self._failures.popitem(last=False)
+            return None
+
+        self.stats["fetched"] += 1
+        self._failures.pop(job_id, None)
+        if self._tasks:
+            self._unwritten[job_id] = description
+            await self._results.put((job_id, description))
+        else:
+            await self._save({job_id: description})
+        return description
+
+    async def _wait_for_rate_limit(self, platform: str):
+        rate = self.rates.get(platform)
+        if not rate:
+            return
+        # Reserve the next free slot for this platform, then sleep until it
+        async with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_request.get(platform, 0.0))
+            self._next_request[platform] = slot + 1 / rate
+        await asyncio.sleep(slot - now)
+
+    async def _queued_jobs(self) -> AsyncIterator[tuple[str, str, str]]:
+        while True:
+            yield await self._queue.get()
+
+    async def _consume(self):
+        async for batch in micro_batches(self._queued_jobs(), 50, 0.1):
+            try:
+                async with SessionLocal() as db:
+                    existing = await load_descriptions(db, [job_id for job_id, _, _ in batch])
+            except Exception as e:
+                print(f"Prefetch lookup error: {e}")
+                existing = {}
+
+            for job_id, platform, url in batch:
+                if job_id in existing:
+                    self.stats["skipped"] += 1
+                    self._queued.discard(job_id)
+                    continue
+                # Don't pull more from the queue than can be fetched at once
+                while len(self._fetches) >= self.concurrency:
+                    await asyncio.wait(self._fetches, return_when=asyncio.FIRST_COMPLETED)
+                task = asyncio.create_task(self._prefetch(job_id, platform, url))
+                self._fetches.add(task)
+                task.add_done_callback(self._fetches.discard)
+
+    async def _prefetch(self, job_id: str, platform: str, url: str):
+        try:
+            await self.fetch(job_id, platform, url)
+        except Exception as e:
+            print(f"Prefetch error for {url}: {e}")
+        finally:
+            self._queued.discard(job_id)
+
+    async def _results_stream(self) -> AsyncIterator[tuple[str, str]]:
+        while True:
+            yield await self._results.get()
+
+    async def _write(self):
+        async for batch in micro_batches(self._results_stream(), self.write_batch, self.write_window):
+            try:
+                await self._save(dict(batch))
+                self.stats["written"] += len(batch)
+            except Exception as e:
+                print(f"Prefetch write error: {e}")
+            # Skipped when cancelled mid-write: stop() writes them instead
+            for job_id, _ in batch:
+                self._unwritten.pop(job_id, None)
+
+    async def _save(self, descriptions: dict[str, str]):
+        async with SessionLocal() as db:
+            await db.run_sync(save_descriptions_sync, descriptions)
+            await db.commit()
+
+
+description_prefetcher = DescriptionPrefetcher()
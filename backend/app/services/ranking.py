@@ -0,0 +1,140 @@
+from typing import AsyncIterator, Optional
+import asyncio
+
+from ..models import Job
+from .ai_service import ai_service
+from .job_skills import skill_match, skills_in
+from .local_scorer import local_scorer
+from .prefetch import description_prefetcher
+
+
+async def rank_jobs(
+    resume_text: str,
+    jobs: list[Job],
+    descriptions: dict[str, str],
+    job_skills: dict[str, list[str]],
+    concurrency: int,
+    top_k: Optional[int] = None,
+    min_match: int = 0,
+    canonical_jobs: Optional[dict[str, Job]] = None,
+) -> AsyncIterator[dict]:
+    """Analyze a resume against many jobs, yielding events as analyses complete.
+
+    Jobs are pre-scored locally in one batch; those below the gate are
+    skipped and the rest go to the LLM best local score first, at most
+    `concurrency` at a time. Jobs without a stored description are fetched
+    together in the background first. Once top_k analyses scored at least
+    min_match, the remaining work is cancelled. matching_skills and
+    missing_skills come from job_skills ({job_id: skills}) when known.
+    Duplicates of a job already in the list are skipped, and each job is
+    analyzed as its canonical job (from canonical_jobs when not in the list),
+    like /match. descriptions and job_skills are keyed by the analyzed job.
+    A job whose analysis fails is skipped with reason "error". Closing the
+    iterator cancels everything still running.
+    """
+    groups: dict[str, Job] = {}
+    duplicates = []
+    for job in jobs:
+        canonical_id = job.canonical_id or job.id
+        if canonical_id in groups:
+            duplicates.append((job, groups[canonical_id]))
+        else:
+            groups[canonical_id] = job
+    for job, kept in duplicates:
+        yield {"type": "skipped", "job_id": job.id, "reason": "duplicate", "duplicate_of": kept.id}
+
+    # {listed job id: job analyzed for it}
+    known_jobs = {**(canonical_jobs or {}), **{job.id: job for job in jobs}}
+    targets = {job.id: known_jobs.get(canonical_id, job) for canonical_id, job in groups.items()}
+    jobs = list(groups.values())
+
+    known = [job for job in jobs if targets[job.id].id in descriptions]
+    scores = await asyncio.to_thread(
+        local_scorer.score_many, resume_text, [descriptions[targets[job.id].id] for job in known]
+    )
+    local_scores = {job.id: float(score) for job, score in zip(known, scores["score"])}
+    resume_skills = set(skills_in(resume_text))
+    jobs = sorted(known, key=lambda job: local_scores[job.id], reverse=True) + [
+        job for job in jobs if job.id not in local_scores
+    ]
+
+    loop = asyncio.get_running_loop()
+    fetched: dict[str, asyncio.Future] = {
+        targets[job.id].id: loop.create_future() for job in jobs if job.id not in local_scores
+    }
+
+    async def fetch_missing():
+        try:
+            missing = [targets[job.id] for job in jobs if targets[job.id].id in fetched]
+            async for job, description in description_prefetcher.fetch_many(missing):
+                fetched[job.id].set_result(description)
+        finally:
+            for future in fetched.values():
+                if not future.done():
+                    future.set_result(None)
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def analyze_job(job: Job) -> tuple[Job, Optional[dict], Optional[str]]:
+        target = targets[job.id]
+        description = descriptions.get(target.id)
+        if description is None:
+            description = await fetched[target.id]
+            if not description:
+                return job, None, "no_description"
+            local_scores[job.id] = local_scorer.score(resume_text, description)["score"]
+        skills = skill_match(job_skills.get(target.id) or skills_in(description), resume_skills)
+
+        if not local_scorer.passes_gate(local_scores[job.id]):
+            return job, None, "below_gate"
+
+        async with slots:
+            analysis = await ai_service.analyze_resume_match(
+                resume_text=resume_text,
+                job_description=description,
+                job_title=target.title,
+                job_id=target.id,
+            )
+        return job, {**analysis, **skills, "local_score": local_scores[job.id], "llm_analyzed": True}, None
+
+    errors: dict[str, str] = {}
+
+    async def analyze(job: Job) -> tuple[Job, Optional[dict], Optional[str]]:
+        # One failed job must not end the stream for all the others
+        try:
+            return await analyze_job(job)
+        except Exception as e:
+            print(f"Ranking error for job {job.id}: {e}")
+            errors[job.id] = str(e)
+            return job, None, "error"
+
+    fetcher = asyncio.create_task(fetch_missing()) if fetched else None
+    tasks = [asyncio.create_task(analyze(job)) for job in jobs]
+    ranking = []
+    try:
+        for done in asyncio.as_completed(tasks):
+            job, analysis, reason = await done
+            if analysis is None:
+                event = {"type": "skipped", "job_id": job.id, "reason": reason, "local_score": local_scores.get(job.id)}
+                if job.id in errors:
+                    event["message"] = errors[job.id]
+                yield event
+                continue
+            ranking.append((analysis["match_percentage"], job.id))
+            yield {"type": "result", "job": job, "analysis": analysis}
+
+            if top_k and sum(1 for score, _ in ranking if score >= min_match) >= top_k:
+                break
+
+        ranking.sort(reverse=True)
+        yield {
+            "type": "done",
+            "completed": len(ranking),
+            "cancelled": sum(1 for task in tasks if not task.done()),
+            "ranking": [{"job_id": job_id, "match_percentage": score} for score, job_id in ranking],
+        }
+    finally:
+        for task in tasks:
+            task.cancel()
+        if fetcher:
+            fetcher.cancel()
@@ -0,0 +1,50 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import hashlib
+
+from ..database import SessionLocal
+from ..models import Resume
+from .resume_parser import extract_resume_text
+from .singleflight import SingleFlight
+
+# Concurrent uploads of the same file share one parse
+parse_flights = SingleFlight()
+
+
+def resume_id_for(file_content: bytes) -> str:
+    return hashlib.sha256(file_content).hexdigest()
+
+
+async def store_resume(db: AsyncSession, filename: str, file_content: bytes) -> Resume:
+    """Parse and store a resume once per distinct file content.
+
+    Raises ValueError for unsupported formats or files without text.
+    """
+    resume_id = resume_id_for(file_content)
+    resume = await db.get(Resume, resume_id)
+    if resume is not None:
+        return resume
+
+    async def parse(_) -> Resume:
+        async with SessionLocal() as parse_db:
+            # Stored while we were joining
+            stored = await parse_db.get(Resume, resume_id)
+            if stored is not None:
+                return stored
+
+            # PDF/DOCX parsing is CPU-bound, keep it off the event loop
+            text = await asyncio.to_thread(extract_resume_text, filename, file_content)
+            if not text:
+                raise ValueError("Could not extract text from resume")
+
+            stored = Resume(id=resume_id, filename=filename, size=len(file_content), text=text)
+            parse_db.add(stored)
+            await parse_db.commit()
+            return stored
+
+    return await parse_flights.join(resume_id, parse).wait()
+
+
+async def get_resume(db: AsyncSession, resume_id: str) -> Optional[Resume]:
+    return await db.get(Resume, resume_id)
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from typing import Optional
+import asyncio
+import json
+import sqlite3
+import time
+
+from ..config import get_settings
+
+
+def normalize_text(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def make_search_key(
+    platform: str,
+    query: str,
+    location: Optional[str],
+    job_type: Optional[str],
+    max_results: int = 20,
+) -> str:
+    """Cache key for one platform's scrape, insensitive to case and whitespace."""
+    return "|".join([
+        platform,
+        normalize_text(query),
+        normalize_text(location),
+        job_type or "all",
+        str(max_results),
+    ])
+
+
+class SearchCache:
+    """TTL + LRU cache of scraped search results, with an optional SQLite tier.
+
+    The memory tier is bounded by the JSON size of its entries; the SQLite tier
+    (enabled by search_cache_db) keeps results across restarts.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.ttls = {
+            "linkedin": settings.search_cache_ttl_linkedin,
+            "glassdoor": settings.search_cache_ttl_glassdoor,
+        }
+        self.max_bytes = settings.search_cache_max_bytes
+        self.db_path = settings.search_cache_db or None
+
+        self._entries: OrderedDict[str, tuple[float, list[dict], int]] = OrderedDict()
+        self._bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def ttl_for(self, platform: str) -> int:
+        return self.ttls.get(platform, 600)
+
+    async def get(self, key: str, platform: str, max_age: Optional[int] = None) -> Optional[list[dict]]:
+        """Return cached jobs younger than max_age (default: the platform TTL)."""
+        max_age = self.ttl_for(platform) if max_age is None else max_age
+        if max_age <= 0:
+            self.stats["misses"] += 1
+            return None
+
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, jobs, _ = entry
+            if now - stored_at <= max_age:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return jobs
+            if now - stored_at > self.ttl_for(platform):
+                self._remove(key)
+
+        if self.db_path:
+            row = await asyncio.to_thread(self._db_get, key)
+            if row is not None:
+                stored_at, jobs = row
+                if now - stored_at <= max_age:
+                    self._store(key, stored_at, jobs)
+                    self.stats["hits"] += 1
+                    return jobs
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, platform: str, jobs: list[dict]):
+        stored_at = time.time()
+        self._store(key, stored_at, jobs)
+        if self.db_path:
+            await asyncio.to_thread(self._db_set, key, platform, stored_at, jobs)
+
+    async def close(self):
+        """Close the SQLite tier's connection (reopened on next use)."""
+        if self._db is not None:
+            db, self._db = self._db, None
+            await asyncio.to_thread(db.close)
+
+    def status(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "persistent": bool(self.db_path),
+            **self.stats,
+        }
+
+    def _store(self, key: str, stored_at: float, jobs: list[dict]):
+        size = len(json.dumps(jobs))
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = (stored_at, jobs, size)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, platform TEXT, stored_at REAL, payload TEXT)"
+            )
+        return self._db
+
+    def _db_get(self, key: str) -> Optional[tuple[float, list[dict]]]:
+        row = self._connect().execute(
+            "SELECT stored_at, payload FROM search_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _db_set(self, key: str, platform: str, stored_at: float, jobs: list[dict]):
+        db = self._connect()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, platform, stored_at, payload) VALUES (?, ?, ?, ?)",
+                (key, platform, stored_at, json.dumps(jobs)),
+            )
+            # Drop anything older than the longest TTL
+            db.execute(
+                "DELETE FROM search_cache WHERE stored_at < ?",
+                (stored_at - max(self.ttls.values()),),
+            )
+
+
+search_cache = SearchCache()
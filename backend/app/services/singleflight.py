@@ -0,0 +1,88 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+import asyncio
+
+
+class Flight:
+    """A shared in-flight task whose emitted batches can be replayed.
+
+    The producer publishes batches as it goes; subscribers that join late get
+    every batch emitted so far, then the live ones, until the flight finishes.
+    """
+
+    def __init__(self):
+        self.batches: list[Any] = []
+        self.done = False
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, batch: Any):
+        self.batches.append(batch)
+        self._notify()
+
+    def finish(self, value: Any = None, error: Optional[BaseException] = None):
+        self.value = value
+        self.error = error
+        self.done = True
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            while index < len(self.batches):
+                yield self.batches[index]
+                index += 1
+
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+            await self._changed.wait()
+
+    async def wait(self) -> Any:
+        """Wait for the producer's return value without being able to cancel it."""
+        while not self.done:
+            await self._changed.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def _notify(self):
+        # Wake everyone waiting on the current event and arm a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one running task."""
+
+    def __init__(self):
+        self._flights: dict[str, Flight] = {}
+
+    def join(self, key: str, producer: Callable[[Flight], Awaitable[Any]]) -> Flight:
+        """Return the in-flight task for key, starting producer(flight) if there is none."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._run(key, flight, producer))
+        return flight
+
+    def get(self, key: str) -> Optional[Flight]:
+        return self._flights.get(key)
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def tasks(self) -> list[asyncio.Task]:
+        return [flight.task for flight in self._flights.values() if flight.task]
+
+    async def _run(self, key: str, flight: Flight, producer: Callable[[Flight], Awaitable[Any]]):
+        try:
+            flight.finish(value=await producer(flight))
+        except BaseException as e:
+            flight.finish(error=e)
+        finally:
+            self._flights.pop(key, None)
@@ -0,0 +1,161 @@
+from collections import Counter
+import json
+import re
+
+from ..config import get_settings
+
+# Skill vocabulary shared by the local scorer and skill extraction: the
+# lowercase term as it appears in text, mapped to its display name.
+# Common English words (go, rest, express, ...) are left out on purpose.
+BUILTIN_SKILLS: dict[str, str] = {
+    # Languages
+    "python": "Python",
+    "java": "Java",
+    "javascript": "JavaScript",
+    "typescript": "TypeScript",
+    "c++": "C++",
+    "c#": "C#",
+    "golang": "Go",
+    "rust": "Rust",
+    "ruby": "Ruby",
+    "php": "PHP",
+    "kotlin": "Kotlin",
+    "swift": "Swift",
+    "scala": "Scala",
+    "sql": "SQL",
+    "bash": "Bash",
+    "html": "HTML",
+    "css": "CSS",
+    # Frameworks and libraries
+    "react": "React",
+    "angular": "Angular",
+    "vue": "Vue",
+    "next.js": "Next.js",
+    "node.js": "Node.js",
+    "django": "Django",
+    "flask": "Flask",
+    "fastapi": "FastAPI",
+    "spring boot": "Spring Boot",
+    ".net": ".NET",
+    "rails": "Rails",
+    "laravel": "Laravel",
+    "pandas": "pandas",
+    "numpy": "NumPy",
+    "pytorch": "PyTorch",
+    "tensorflow": "TensorFlow",
+    "scikit-learn": "scikit-learn",
+    "spark": "Spark",
+    "kafka": "Kafka",
+    "graphql": "GraphQL",
+    # Data stores
+    "postgresql": "PostgreSQL",
+    "postgres": "PostgreSQL",
+    "mysql": "MySQL",
+    "mongodb": "MongoDB",
+    "redis": "Redis",
+    "elasticsearch": "Elasticsearch",
+    "sqlite": "SQLite",
+    "snowflake": "Snowflake",
+    "bigquery": "BigQuery",
+    # Cloud and infrastructure
+    "aws": "AWS",
+    "azure": "Azure",
+    "gcp": "GCP",
+    "google cloud": "GCP",
+    "docker": "Docker",
+    "kubernetes": "Kubernetes",
+    "terraform": "Terraform",
+    "ansible": "Ansible",
+    "linux": "Linux",
+    "git": "Git",
+    "ci/cd": "CI/CD",
+    "jenkins": "Jenkins",
+    "github actions": "GitHub Actions",
+    "microservices": "Microservices",
+    # Data and ML
+    "machine learning": "Machine Learning",
+    "deep learning": "Deep Learning",
+    "nlp": "NLP",
+    "computer vision": "Computer Vision",
+    "data analysis": "Data Analysis",
+    "data engineering": "Data Engineering",
+    "etl": "ETL",
+    "airflow": "Airflow",
+    "tableau": "Tableau",
+    "power bi": "Power BI",
+    "excel": "Excel",
+    "statistics": "Statistics",
+    "llm": "LLM",
+    # Practices and other
+    "agile": "Agile",
+    "scrum": "Scrum",
+    "tdd": "TDD",
+    "devops": "DevOps",
+    "security": "Security",
+    "figma": "Figma",
+    "jira": "Jira",
+    "product management": "Product Management",
+    "project management": "Project Management",
+    "seo": "SEO",
+    "salesforce": "Salesforce",
+    "sap": "SAP",
+}
+
+
+def load_skill_dictionary() -> dict[str, str]:
+    """Built-in skills plus the JSON {term: display name} file in skills_file."""
+    skills = dict(BUILTIN_SKILLS)
+    path = get_settings().skills_file
+    if path:
+        with open(path, encoding="utf-8") as f:
+            skills.update({term.lower(): name for term, name in json.load(f).items()})
+    return skills
+
+
+SKILLS = load_skill_dictionary()
+
+
+class SkillMatcher:
+    """Finds every dictionary term in one pass over the text.
+
+    The terms are compiled into a single trie-shaped regular expression
+    (shared prefixes are tried once, longest term first), which does the
+    work of an Aho-Corasick automaton inside the C regex engine. Matching is
+    case-insensitive, treats any run of whitespace as a single space, and
+    only counts whole words (no "java" inside "javascript").
+    """
+
+    def __init__(self, terms: dict[str, str]):
+        self.names = terms
+        self.pattern = re.compile(r"(?<![^\W_])(" + self._trie_pattern(terms) + r")(?![^\W_])")
+
+    @staticmethod
+    def _trie_pattern(terms) -> str:
+        trie: dict = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # A term ending here is the fallback when no longer one matches
+            return f"(?:{body})?" if "" in node else body
+
+        return build(trie)
+
+    def find(self, text: str) -> Counter:
+        """Count skills (by display name) mentioned in text."""
+        text = " ".join(text.lower().split())
+        return Counter(self.names[term] for term in self.pattern.findall(text))
+
+
+skill_matcher = SkillMatcher(SKILLS)
+
+
+def extract_skills(text: str) -> Counter:
+    return skill_matcher.find(text or "")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Load test: /health latency while searches are committing jobs to the database
+
+Runs the app in-process (same event loop as the requests) with the scrapers
+replaced by instant synthetic results, so any blocking DB work shows up
+directly as /health latency.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+import httpx
+
+from app.database import init_db
+from app.main import app
+from app.routers import jobs
+from app.schemas import Platform
+
+JOBS_PER_SEARCH = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+SEARCHES = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+CONCURRENCY = 4
+PROBE_INTERVAL = 0.01  # seconds
+
+
+async def synthetic_scrape(query: str, location: str | None, job_type: str, max_results: int):
+    for i in range(JOBS_PER_SEARCH):
+        yield {
+            "title": f"Engineer {i}",
+            "company": f"Company {i % 100}",
+            "location": "Remote",
+            "url": f"https://www.linkedin.com/jobs/view/{query}-{i}",
+            "platform": "linkedin",
+        }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def main():
+    jobs.SCRAPERS[Platform.LINKEDIN] = synthetic_scrape
+    await init_db()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        searches_done = asyncio.Event()
+        latencies = []
+
+        async def probe_health():
+            # Latency is measured from the scheduled send time, so time spent
+            # waiting for a blocked event loop counts (no coordinated omission)
+            scheduled = time.perf_counter()
+            while not searches_done.is_set():
+                scheduled += PROBE_INTERVAL
+                await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+                await client.get("/health")
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+
+        async def run_searches(worker: int):
+            for n in range(worker, SEARCHES, CONCURRENCY):
+                await client.post(
+                    "/api/jobs/search",
+                    json={"query": f"search-{n}", "platforms": ["linkedin"], "max_age": 0},
+                )
+
+        start = time.perf_counter()
+        probe = asyncio.create_task(probe_health())
+        await asyncio.gather(*(run_searches(w) for w in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+        searches_done.set()
+        await probe
+
+    print(f"{SEARCHES} searches x {JOBS_PER_SEARCH} jobs, {CONCURRENCY} concurrent: {elapsed:.2f} s")
+    print(f"/health samples: {len(latencies)}")
+    print(f"  p50: {statistics.median(latencies):8.1f} ms")
+    print(f"  p99: {percentile(latencies, 99):8.1f} ms")
+    print(f"  max: {max(latencies):8.1f} ms")
+
+
+asyncio.run(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Microbenchmark: ingest synthetic scraped jobs, per-row lookup vs bulk upsert"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, apply_sqlite_pragmas
+from app.migrations import run_migrations
+from app.models import Job
+from app.services.ingest import ingest_jobs
+
+N_JOBS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+
+def synthetic_jobs(n: int, offset: int = 0) -> list[dict]:
+    return [
+        {
+            "title": f"Software Engineer {i}",
+            "company": f"Company {i % 500}",
+            "location": "Paris, France",
+            "url": f"https://www.linkedin.com/jobs/view/{i}",
+            "posted_date": "2024-01-01",
+            "platform": "linkedin",
+            "job_type": "remote",
+            "salary_range": None,
+            "description": None,
+        }
+        for i in range(offset, offset + n)
+    ]
+
+
+def fresh_session(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    # Same schema as init_db(): the jobs_fts trigger, job_search_keys and
+    # the other migrated tables are part of every insert
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        run_migrations(conn)
+    return sessionmaker(bind=engine)()
+
+
+def per_row_ingest(db, jobs: list[dict]):
+    """The old search endpoint loop: one SELECT per scraped job."""
+    for job_data in jobs:
+        existing = db.query(Job).filter(Job.url == job_data["url"]).first()
+        if not existing:
+            # Descriptions live in job_descriptions now (all None here)
+            row = dict(job_data)
+            row.pop("description", None)
+            db.add(Job(id=str(uuid.uuid4()), **row))
+    db.commit()
+
+
+def bulk_ingest(db, jobs: list[dict]):
+    ingest_jobs(db, jobs, refresh=True)
+    db.commit()
+
+
+def timed(label: str, fn, db, jobs: list[dict]):
+    start = time.perf_counter()
+    fn(db, jobs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms  ({len(jobs) / elapsed:,.0f} jobs/s)")
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "bench.db")
+    # Half of the second batch already exists, like a repeated search
+    first = synthetic_jobs(N_JOBS)
+    second = synthetic_jobs(N_JOBS, offset=N_JOBS // 2)
+
+    print(f"Ingesting {N_JOBS:,} synthetic jobs")
+    for label, fn in [("per-row lookup", per_row_ingest), ("bulk upsert (ingest_jobs)", bulk_ingest)]:
+        db = fresh_session(path)
+        print(f"{label}:")
+        timed("empty table", fn, db, first)
+        timed("50% already stored", fn, db, second)
+        db.close()
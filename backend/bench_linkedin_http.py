@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark: LinkedIn browserless HTTP path vs the Playwright path
+
+Offline (default): checks extract_cards_html and _parse_card against the
+saved guest-API page in fixtures/linkedin_guest_search.html, then serves that
+page (ids shifted per page) through a mock transport and reports HTTP-path
+searches per second (parsing + pipeline overhead).
+
+Live (--live "query" [location]): runs the same search against LinkedIn
+with each backend and reports searches per second for both.
+"""
+
+import asyncio
+import os
+import re
+import sys
+import time
+import urllib.parse
+
+import httpx
+
+from app.config import get_settings
+from app.scrapers import http_client
+from app.scrapers.browser_pool import browser_pool
+from app.scrapers.extraction import extract_cards_html
+from app.scrapers.linkedin import LinkedInScraper
+
+MAX_RESULTS = 20
+ROUNDS = 200
+
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "linkedin_guest_search.html")
+
+# What _parse_card must return for the fixture's cards (the obfuscated 4th
+# card is dropped); job_type "all", so no job_type
+EXPECTED = [
+    ("Développeur Python (H/F)", "Acme", "Paris, Île-de-France, France", "d%C3%A9veloppeur-python-at-acme-3912345601", "2024-05-13"),
+    ("Senior Backend Engineer", "Globex Corporation", "Paris, Île-de-France, France", "senior-backend-engineer-at-globex-corporation-3912345602", "2024-05-14"),
+    ("Data Engineer", "Initech", "Lyon, Auvergne-Rhône-Alpes, France", "data-engineer-at-initech-3912345603", "2024-05-10"),
+    ("Ingénieur DevOps", "Umbrella SAS", "Paris, Île-de-France, France", "ing%C3%A9nieur-devops-at-umbrella-sas-3912345605", "2024-05-09"),
+    ("Full Stack Developer - React/Node.js", "Hooli", "Île-de-France, France", "full-stack-developer-at-hooli-3912345606", "2024-05-15"),
+    ("Machine Learning Engineer", "Stark Industries", "Paris, Île-de-France, France", "machine-learning-engineer-at-stark-industries-3912345607", "2024-05-08"),
+    ("Développeur Java & Spring", "Wayne Enterprises", "Nanterre, Île-de-France, France", "d%C3%A9veloppeur-java-at-wayne-enterprises-3912345608", "2024-05-11"),
+    ("Site Reliability Engineer", "Cyberdyne", "France", "site-reliability-engineer-at-cyberdyne-3912345609", "2024-05-07"),
+    ("Python Developer", "Soylent", "Paris, Île-de-France, France", "python-developer-at-soylent-3912345610", "2024-05-16"),
+]
+
+with open(FIXTURE, encoding="utf-8") as f:
+    fixture_html = f.read()
+
+
+def check_fixture():
+    """Check extract_cards_html and _parse_card against the saved page."""
+    scraper = LinkedInScraper()
+    cards = extract_cards_html(fixture_html, scraper.CARD_SELECTORS, scraper.CARD_FIELDS)
+    assert len(cards) == 10, len(cards)
+
+    jobs = [job for job in (scraper._parse_card(card, "all") for card in cards) if job]
+    expected = [
+        {
+            "title": title,
+            "company": company,
+            "location": location,
+            "url": f"https://fr.linkedin.com/jobs/view/{slug}",
+            "posted_date": posted_date,
+            "platform": "linkedin",
+            "job_type": None,
+            "salary_range": None,
+            "description": None,
+        }
+        for title, company, location, slug, posted_date in EXPECTED
+    ]
+    assert jobs == expected, jobs
+    print(f"Fixture: {len(cards)} cards, {len(jobs)} jobs parsed as expected")
+
+
+def guest_page(start: int) -> str:
+    # The fixture with posting ids shifted per page, so pages don't overlap
+    return re.sub(r"\b39123456(\d\d)\b", lambda m: str(3912345600 + start + int(m.group(1))), fixture_html)
+
+
+def mock_handler(request: httpx.Request) -> httpx.Response:
+    start = int(urllib.parse.parse_qs(request.url.query.decode()).get("start", ["0"])[0])
+    return httpx.Response(200, text=guest_page(start))
+
+
+async def searches_per_second(label: str, rounds: int, query: str, location: str | None):
+    start = time.perf_counter()
+    total = 0
+    for _ in range(rounds):
+        jobs = await LinkedInScraper().search_jobs(query, location, "all", MAX_RESULTS)
+        total += len(jobs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {rounds / elapsed:10.1f} searches/s  ({elapsed / rounds * 1000:.1f} ms/search, {total // rounds} jobs/search)")
+
+
+async def offline():
+    http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(mock_handler))
+    os.environ["LINKEDIN_BACKEND"] = "http"
+    get_settings.cache_clear()
+
+    check_fixture()
+    jobs = await LinkedInScraper().search_jobs("software engineer", "Paris", "all", MAX_RESULTS)
+    # Each guest page has len(EXPECTED) usable cards
+    pages = -(-MAX_RESULTS // LinkedInScraper.GUEST_PAGE_SIZE)
+    assert len(jobs) == pages * len(EXPECTED), len(jobs)
+    assert all("*" not in job["title"] for job in jobs)
+    assert jobs[0]["url"].startswith("https://www.linkedin.com/jobs/view/"), jobs[0]["url"]
+    print()
+
+    print(f"Offline HTTP path, max_results={MAX_RESULTS}, {ROUNDS} searches:")
+    await searches_per_second("http", ROUNDS, "software engineer", "Paris")
+    await http_client.close_http_client()
+
+
+async def live(query: str, location: str | None):
+    print(f"Live search {query!r} ({location or 'any location'}), max_results={MAX_RESULTS}:")
+    for backend, rounds in [("http", 5), ("browser", 2)]:
+        os.environ["LINKEDIN_BACKEND"] = backend
+        get_settings.cache_clear()
+        await searches_per_second(backend, rounds, query, location)
+    await browser_pool.stop()
+    await http_client.close_http_client()
+
+
+if len(sys.argv) > 2 and sys.argv[1] == "--live":
+    asyncio.run(live(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None))
+else:
+    asyncio.run(offline())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark: local resume/job pre-scoring throughput
+
+Scores one resume against N synthetic job descriptions (default 5000) in a
+single batch, cold (descriptions tokenized for the first time) and warm
+(term counts cached), and compares with scoring jobs one call at a time.
+Checks first that slash- and dot-joined skill lists are scored as skills.
+"""
+
+import random
+import sys
+import time
+
+from app.services.local_scorer import local_scorer, term_counts
+from app.services.skills import SKILLS, extract_skills
+
+JOBS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+WORDS_PER_JOB = 350
+
+random.seed(42)
+FILLER = ["".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=random.randint(3, 10))) for _ in range(5000)]
+SKILL_TERMS = list(SKILLS)
+
+
+def synthetic_text(words: int, skills: int) -> str:
+    parts = random.choices(FILLER, k=words) + random.sample(SKILL_TERMS, skills)
+    random.shuffle(parts)
+    return " ".join(parts)
+
+
+def timed(label: str, func, jobs: int):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {elapsed * 1000:9.1f} ms  {jobs / elapsed:12,.0f} jobs/s")
+    return result
+
+
+def check_joined_skills():
+    """Skills joined with "/" or "." count like separate ones, and agree
+    with extract_skills()."""
+    job = "Python/Django, AWS/GCP, Docker/Kubernetes, PostgreSQL/Redis"
+    local = local_scorer.score("Python, Django, AWS, GCP, Docker, Kubernetes, PostgreSQL and Redis", job)
+    assert local["skill_overlap"] == 1.0, local
+    assert local_scorer.passes_gate(local["score"]), local
+    assert local["matching_skills"] == list(extract_skills(job)), local
+
+    local = local_scorer.score("java, react", "java/spring, react.js")
+    assert set(local["matching_skills"]) == {"Java", "React"}, local
+    print("Joined skill lists: ok")
+
+
+check_joined_skills()
+
+resume = synthetic_text(600, 15)
+descriptions = [synthetic_text(WORDS_PER_JOB, random.randint(3, 12)) for _ in range(JOBS)]
+
+print(f"{JOBS} jobs x ~{WORDS_PER_JOB} words, one resume:")
+term_counts.cache_clear()
+timed("batch, cold", lambda: local_scorer.score_many(resume, descriptions), JOBS)
+scores = timed("batch, warm", lambda: local_scorer.score_many(resume, descriptions), JOBS)
+
+single = min(JOBS, 1000)
+timed(f"one at a time ({single})", lambda: [local_scorer.score_many(resume, [d]) for d in descriptions[:single]], single)
+
+gate = local_scorer.gate
+passed = int((scores["score"] >= gate).sum())
+print(f"\nGate {gate}: {passed}/{JOBS} jobs would get an LLM analysis")
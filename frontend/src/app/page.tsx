@@ -44,6 +44,8 @@ export default function Home() {
               break;
             case "jobs":
               setJobs((prev) => [...prev, ...event.jobs]);
+              break;
+            case "platform_done":
               setLoadingPlatforms((prev) =>
                 prev.filter((p) => p !== event.platform)
               );
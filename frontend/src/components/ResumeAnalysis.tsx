@@ -55,6 +55,11 @@ export default function ResumeAnalysis({ analysis }: ResumeAnalysisProps) {
           </span>
         </div>
         <p className="mt-2 text-gray-600 font-medium">Match Score</p>
+        {analysis.error && (
+          <p className="mt-1 text-sm text-amber-600">
+            Partial analysis: {analysis.error}
+          </p>
+        )}
       </div>
 
       {/* Matching Skills */}
@@ -2,7 +2,10 @@ import {
   JobSearchRequest,
   JobSearchResponse,
   Job,
+  LocalSearchParams,
+  LocalSearchResponse,
   ResumeAnalysisResponse,
+  ResumeUploadResponse,
 } from "@/types";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
@@ -27,7 +30,8 @@ export async function searchJobs(
 
 export type StreamEvent =
   | { type: "start"; platforms: string[] }
-  | { type: "jobs"; platform: string; jobs: Job[]; count: number }
+  | { type: "jobs"; platform: string; jobs: Job[]; count: number; cached?: boolean; local?: boolean }
+  | { type: "platform_done"; platform: string; count: number }
   | { type: "done" }
   | { type: "error"; message: string };
 
@@ -47,6 +51,13 @@ export async function searchJobsStream(
     throw new Error("Failed to search jobs");
   }
 
+  await readEventStream(response, onEvent);
+}
+
+async function readEventStream<T>(
+  response: Response,
+  onEvent: (event: T) => void
+): Promise<void> {
   const reader = response.body?.getReader();
   if (!reader) {
     throw new Error("No response body");
@@ -78,6 +89,25 @@ export async function searchJobsStream(
   }
 }
 
+export async function searchStoredJobs(
+  params: LocalSearchParams
+): Promise<LocalSearchResponse> {
+  const query = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value !== undefined && value !== "") {
+      query.set(key, String(value));
+    }
+  }
+
+  const response = await fetch(`${API_BASE}/api/jobs?${query}`);
+
+  if (!response.ok) {
+    throw new Error("Failed to search stored jobs");
+  }
+
+  return response.json();
+}
+
 export async function getJob(jobId: string): Promise<Job> {
   const response = await fetch(`${API_BASE}/api/jobs/${jobId}`);
 
@@ -88,17 +118,70 @@ export async function getJob(jobId: string): Promise<Job> {
   return response.json();
 }
 
+export type JobDetailsEvent =
+  | { type: "job"; status: "stored" | "fetched" | "unavailable"; job: Job }
+  | { type: "not_found"; job_id: string }
+  | { type: "done" }
+  | { type: "error"; message: string };
+
+export async function getJobsDetails(
+  jobIds: string[],
+  onEvent: (event: JobDetailsEvent) => void
+): Promise<void> {
+  const response = await fetch(`${API_BASE}/api/jobs/details`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ job_ids: jobIds }),
+  });
+
+  if (!response.ok) {
+    throw new Error("Failed to get job details");
+  }
+
+  await readEventStream(response, onEvent);
+}
+
+// Resume ids of files already uploaded, so each file is parsed only once
+const uploadedResumes = new WeakMap<File, string>();
+
+export async function uploadResume(resume: File): Promise<ResumeUploadResponse> {
+  const formData = new FormData();
+  formData.append("resume", resume);
+
+  const response = await fetch(`${API_BASE}/api/resumes`, {
+    method: "POST",
+    body: formData,
+  });
+
+  if (!response.ok) {
+    throw new Error("Failed to upload resume");
+  }
+
+  return response.json();
+}
+
+async function matchFormData(jobId: string, resume: File): Promise<FormData> {
+  let resumeId = uploadedResumes.get(resume);
+  if (!resumeId) {
+    resumeId = (await uploadResume(resume)).resume_id;
+    uploadedResumes.set(resume, resumeId);
+  }
+
+  const formData = new FormData();
+  formData.append("job_id", jobId);
+  formData.append("resume_id", resumeId);
+  return formData;
+}
+
 export async function analyzeResume(
   jobId: string,
   resume: File
 ): Promise<ResumeAnalysisResponse> {
-  const formData = new FormData();
-  formData.append("job_id", jobId);
-  formData.append("resume", resume);
-
   const response = await fetch(`${API_BASE}/api/analysis/match`, {
     method: "POST",
-    body: formData,
+    body: await matchFormData(jobId, resume),
   });
 
   if (!response.ok) {
@@ -107,3 +190,70 @@ export async function analyzeResume(
 
   return response.json();
 }
+
+export type AnalysisEvent =
+  | { type: "start"; job_id: string; resume_id: string; local_score: number }
+  | { type: "match_percentage"; value: number }
+  | { type: "matching_skill" | "missing_skill" | "recommendation"; value: string }
+  | { type: "result"; analysis: ResumeAnalysisResponse }
+  | { type: "error"; message: string };
+
+export async function analyzeResumeStream(
+  jobId: string,
+  resume: File,
+  onEvent: (event: AnalysisEvent) => void
+): Promise<void> {
+  const response = await fetch(`${API_BASE}/api/analysis/match/stream`, {
+    method: "POST",
+    body: await matchFormData(jobId, resume),
+  });
+
+  if (!response.ok) {
+    throw new Error("Failed to analyze resume");
+  }
+
+  await readEventStream(response, onEvent);
+}
+
+export type RankEvent =
+  | { type: "start"; total: number }
+  | { type: "result"; job: Job; analysis: ResumeAnalysisResponse }
+  | {
+      type: "skipped";
+      job_id: string;
+      reason: string;
+      duplicate_of?: string;
+      message?: string;
+    }
+  | {
+      type: "done";
+      completed: number;
+      cancelled: number;
+      ranking: { job_id: string; match_percentage: number }[];
+    }
+  | { type: "error"; message: string };
+
+export async function rankJobs(
+  request: {
+    resume_id: string;
+    job_ids?: string[];
+    search?: JobSearchRequest;
+    top_k?: number;
+    min_match?: number;
+  },
+  onEvent: (event: RankEvent) => void
+): Promise<void> {
+  const response = await fetch(`${API_BASE}/api/analysis/rank`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    throw new Error("Failed to rank jobs");
+  }
+
+  await readEventStream(response, onEvent);
+}
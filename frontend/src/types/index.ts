@@ -13,6 +13,7 @@ export interface Job {
   url: string;
   platform: string;
   posted_date: string | null;
+  canonical_id?: string | null;
 }
 
 export interface JobSearchRequest {
@@ -22,6 +23,8 @@ export interface JobSearchRequest {
   salary_min?: number;
   salary_max?: number;
   platforms: Platform[];
+  local_first?: boolean;
+  collapse_duplicates?: boolean;
 }
 
 export interface JobSearchResponse {
@@ -29,9 +32,34 @@ export interface JobSearchResponse {
   total: number;
 }
 
+export interface LocalSearchParams {
+  q?: string;
+  platform?: Platform;
+  job_type?: JobType;
+  location?: string;
+  limit?: number;
+  cursor?: string;
+  collapse?: boolean;
+}
+
+export interface LocalSearchResponse {
+  jobs: Job[];
+  next_cursor: string | null;
+}
+
 export interface ResumeAnalysisResponse {
   match_percentage: number;
   matching_skills: string[];
   missing_skills: string[];
   recommendations: string[];
+  local_score?: number;
+  llm_analyzed?: boolean;
+  resume_id?: string;
+  error?: string;
+}
+
+export interface ResumeUploadResponse {
+  resume_id: string;
+  filename?: string;
+  characters: number;
 }